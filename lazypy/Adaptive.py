@@ -0,0 +1,222 @@
+"""
+Lazy Evaluation for Python - main package with primary exports
+
+Copyright (c) 2004, Georg Bauer <gb@murphy.bofh.ms>, 
+Copyright (c) 2011, Alexander Marshalov <alone.amper@gmail.com>, 
+except where the file explicitly names other copyright holders and licenses.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of 
+this software and associated documentation files (the "Software"), to deal in 
+the Software without restriction, including without limitation the rights to 
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ 
+the Software, and to permit persons to whom the Software is furnished to do so, 
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all 
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ 
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR 
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER 
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN 
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import threading
+import time
+from lazypy.Promises import Promise
+from lazypy.Profiling import _name
+
+__all__ = ["Adaptive",
+          ]
+
+def _key(func):
+    """
+    Return what samples and decisions are kept under for a function:
+    it's code object if it has one, the function itself otherwise.
+    """
+
+    code = getattr(func, '__code__', None)
+    if code is not None:
+        return code
+    return func
+
+class Adaptive(object):
+
+    """
+    An adaptive promise class. It's instances can be used wherever a
+    promise class is expected - as the promiseclass of delay and lazy
+    or as the __promiseclass__ of LazyEvaluated classes - and decide per
+    wrapped function wether a call should be deferred at all:
+
+        class Model(LazyEvaluated):
+            __promiseclass__ = Adaptive(threshold=0.0001)
+
+    The first samples calls of a function give promises of lazyclass
+    that measure how long the function takes when they are forced.
+    When samples calls were measured, the decision for the function is
+    made once and for all: if every one of them took less than
+    threshold seconds, the function is called eagerly from then on
+    and the caller gets the plain value. Otherwise it gets promises of
+    lazyclass - or of futureclass, if one is given, so expensive calls
+    run in the background.
+
+    The decisions only depend on the measured samples and the
+    configuration. Samples and decisions are kept per code object, so
+    closures built by the same factory share them, while different
+    functions with the same name don't. Pass decisions (a dictionary
+    mapping function names to 'eager', 'lazy' or 'future') to fix them
+    up front, for example with the decisions() of a previous run, so
+    the behaviour is the same every time. Keep in mind that eager calls
+    raise their exceptions at the call, not when the value is forced.
+    """
+
+    def __init__(self, threshold=0.00005, samples=5, lazyclass=Promise,
+                 futureclass=None, decisions=None):
+        self.threshold = threshold
+        self.samples = samples
+        self.lazyclass = lazyclass
+        self.futureclass = futureclass
+        self.__lock = threading.Lock()
+        self.__timings = {}
+        self.__decisions = {}
+        self.__names = {}
+        self.__configured = {}
+        if decisions:
+            for (name, mode) in decisions.items():
+                self.decide(name, mode)
+
+    def decide(self, func, mode):
+        """
+        Fix the decision for a function, given by the function itself
+        or by it's name - a name applies to all functions of that name
+        that weren't decided otherwise.
+        """
+
+        if mode not in ('eager', 'lazy', 'future'):
+            raise ValueError('mode must be one of eager, lazy or future')
+        if mode == 'future' and self.futureclass is None:
+            raise ValueError('no futureclass for future mode')
+        self.__lock.acquire()
+        try:
+            if isinstance(func, str):
+                self.__configured[func] = mode
+            else:
+                key = _key(func)
+                self.__names[key] = _name(func)
+                self.__decisions[key] = mode
+        finally:
+            self.__lock.release()
+
+    def __report(self, values):
+        """
+        Map the values kept per function to the function names. Names
+        that are used by more than one function get the line number of
+        the function attached.
+        """
+
+        counts = {}
+        for key in values:
+            name = self.__names[key]
+            counts[name] = counts.get(name, 0) + 1
+        result = {}
+        for (key, value) in values.items():
+            name = self.__names[key]
+            if counts[name] > 1:
+                name = '%s:%d' % (name, getattr(key, 'co_firstlineno', 0))
+            result[name] = value
+        return result
+
+    def decisions(self):
+        """
+        Return a dictionary mapping function names to their decision.
+        Functions that are still sampled are not in it.
+        """
+
+        self.__lock.acquire()
+        try:
+            result = dict(self.__configured)
+            result.update(self.__report(self.__decisions))
+            return result
+        finally:
+            self.__lock.release()
+
+    def timings(self):
+        """
+        Return a dictionary mapping function names to the list of
+        measured durations of their samples.
+        """
+
+        self.__lock.acquire()
+        try:
+            return self.__report(dict([(key, list(times)) for (key, times) in self.__timings.items()]))
+        finally:
+            self.__lock.release()
+
+    def reset(self):
+        """
+        Forget all samples and decisions.
+        """
+
+        self.__lock.acquire()
+        try:
+            self.__timings.clear()
+            self.__decisions.clear()
+            self.__names.clear()
+            self.__configured.clear()
+        finally:
+            self.__lock.release()
+
+    def __record(self, key, duration):
+        self.__lock.acquire()
+        try:
+            if key in self.__decisions:
+                return
+            times = self.__timings.setdefault(key, [])
+            times.append(duration)
+            if len(times) >= self.samples:
+                if max(times) < self.threshold:
+                    self.__decisions[key] = 'eager'
+                elif self.futureclass is not None:
+                    self.__decisions[key] = 'future'
+                else:
+                    self.__decisions[key] = 'lazy'
+        finally:
+            self.__lock.release()
+
+    def __sample(self, func, key):
+        """
+        Return a wrapper for func that measures it's duration.
+        """
+
+        def wrapper(*args, **kw):
+            start = time.time()
+            try:
+                return func(*args, **kw)
+            finally:
+                self.__record(key, time.time() - start)
+        wrapper.__name__ = getattr(func, '__name__', 'wrapper')
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    def __call__(self, func, args, kw):
+        key = _key(func)
+        mode = self.__decisions.get(key)
+        if mode is None:
+            if key not in self.__names:
+                self.__lock.acquire()
+                try:
+                    self.__names[key] = _name(func)
+                finally:
+                    self.__lock.release()
+            mode = self.__configured.get(self.__names[key])
+        if mode == 'eager':
+            return func(*args, **kw)
+        elif mode == 'lazy':
+            return self.lazyclass(func, args, kw)
+        elif mode == 'future':
+            return self.futureclass(func, args, kw)
+        return self.lazyclass(self.__sample(func, key), args, kw)
@@ -0,0 +1,204 @@
+"""
+Lazy Evaluation for Python - main package with primary exports
+
+Copyright (c) 2004, Georg Bauer <gb@murphy.bofh.ms>, 
+Copyright (c) 2011, Alexander Marshalov <alone.amper@gmail.com>, 
+except where the file explicitly names other copyright holders and licenses.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of 
+this software and associated documentation files (the "Software"), to deal in 
+the Software without restriction, including without limitation the rights to 
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ 
+the Software, and to permit persons to whom the Software is furnished to do so, 
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all 
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ 
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR 
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER 
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN 
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import inspect
+import os
+import threading
+from lazypy.Promises import Promise, PromiseMetaClass, _value
+from lazypy.Utils import NoneSoFar
+
+__all__ = ["AsyncFuture",
+           "loop",
+          ]
+
+_lock = threading.Lock()
+_state = {}
+
+def _run(loop):
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+def loop():
+    """
+    Return the event loop that runs all async futures, starting it in
+    a daemon thread on first use.
+    """
+
+    _lock.acquire()
+    try:
+        if 'loop' not in _state:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=_run, args=(loop,))
+            thread.daemon = True
+            thread.start()
+            _state['loop'] = loop
+            _state['thread'] = thread
+        return _state['loop']
+    finally:
+        _lock.release()
+
+def _forget():
+    """
+    The loop thread is gone in a forked child, so it has to start
+    it's own one.
+    """
+
+    _state.clear()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget)
+
+async def _call(func, args, kw):
+    """
+    Call the function and wait for the result if it is awaitable.
+    """
+
+    result = func(*args, **kw)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+# It's awful, but works in Python 2 and Python 3
+AsyncFuture = PromiseMetaClass('AsyncFuture', (object,), {})
+class AsyncFuture(AsyncFuture):
+
+    """
+    This class builds futures that run as tasks on one asyncio event
+    loop in a background thread, instead of using a thread each. The
+    function should be a coroutine function (or return an awaitable),
+    so tens of thousands of futures that wait for I/O cost only a task
+    and a coroutine frame each. Plain functions work, too, but they
+    block the loop and all other async futures while they run.
+
+    Forcing an async future from normal code blocks only the calling
+    thread until the task is done. Coroutines running on the loop must
+    not force async futures - that would block the loop they wait
+    for - but they can await them instead.
+    """
+
+    __delayclass__ = Promise
+
+    def __init__(self, func, args, kw):
+        """
+        Hand the thunk to the loop. Futures created on the loop thread
+        itself start their task right away.
+        """
+
+        self.__result = NoneSoFar
+        self.__exception = NoneSoFar
+        self.__task = None
+        self.__waiters = []
+        ev = loop()
+        if threading.current_thread() is _state.get('thread'):
+            self.__start(func, args, kw)
+        else:
+            ev.call_soon_threadsafe(self.__start, func, args, kw)
+
+    def __start(self, func, args, kw):
+        self.__task = asyncio.ensure_future(_call(func, args, kw))
+        self.__task.add_done_callback(self.__done)
+
+    def __done(self, task):
+        """
+        Store the outcome of the task and wake up the threads that
+        wait in force.
+        """
+
+        if task.cancelled():
+            self.__exception = asyncio.CancelledError()
+        elif task.exception() is not None:
+            self.__exception = task.exception()
+        else:
+            self.__result = task.result()
+        self.__task = None
+        _lock.acquire()
+        try:
+            waiters = self.__waiters
+            self.__waiters = None
+        finally:
+            _lock.release()
+        for waiter in waiters:
+            waiter.release()
+
+    def __await__(self):
+        """
+        Coroutines on the loop wait for async futures with await. The
+        task is shielded, so cancelling the awaiting coroutine doesn't
+        cancel the future. The exception of a failed task is stored by
+        the done callback and raised by __force__, anything else - like
+        the cancellation of the awaiting coroutine - is passed on.
+        """
+
+        while self.__result is NoneSoFar and self.__exception is NoneSoFar:
+            task = self.__task
+            if task is None or task.done():
+                # the task isn't started yet or it's done callback
+                # didn't run yet
+                yield from asyncio.sleep(0).__await__()
+                continue
+            try:
+                yield from asyncio.shield(task).__await__()
+            except Exception:
+                if not task.done():
+                    raise
+        return self.__force__()
+
+    def __reduce__(self):
+        """
+        A future is already running, so it is pickled as it's value -
+        pickling waits for the result.
+        """
+
+        return (_value, (self.__force__(),))
+
+    def __force__(self):
+        """
+        This function returns either the value or the exception
+        of the future. If the task isn't done yet, this call will
+        block the calling thread until it is.
+        """
+
+        if self.__result is NoneSoFar and self.__exception is NoneSoFar:
+            if threading.current_thread() is _state.get('thread'):
+                raise RuntimeError('async futures must be awaited on the event loop')
+            waiter = threading.Lock()
+            waiter.acquire()
+            _lock.acquire()
+            try:
+                if self.__waiters is None:
+                    waiter = None
+                else:
+                    self.__waiters.append(waiter)
+            finally:
+                _lock.release()
+            if waiter is not None:
+                waiter.acquire()
+        if self.__result is not NoneSoFar:
+            return self.__result
+        elif self.__exception is not NoneSoFar:
+            raise self.__exception
@@ -25,13 +25,60 @@ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from multiprocessing import Process, Pipe
-from lazypy.Promises import Promise, PromiseMetaClass
-from lazypy.Utils import NoneSoFar
+import itertools
+import os
+import select
+import socket
+import time
+from multiprocessing import Process, Pipe, Semaphore
+from multiprocessing.util import Finalize, register_after_fork
+from multiprocessing.connection import arbitrary_address
+try:
+    from multiprocessing.connection import Connection
+except ImportError:
+    # Python 2 has it in the C module
+    from _multiprocessing import Connection
+from lazypy.Promises import Promise, PromiseMetaClass, force, _value
+from lazypy.Futures import BrokenFutureError
+from lazypy.Utils import NoneSoFar, observers, notify
 
 __all__ = ["ForkedFuture",
+           "ForkedStream",
+           "ForkedDataflowFuture",
           ]
 
+_tokens = itertools.count()
+_consumer = None
+
+def _connection(sock):
+    """
+    Turn a connected socket into a multiprocessing Connection that
+    owns the socket's file descriptor.
+    """
+
+    if hasattr(sock, 'detach'):
+        return Connection(sock.detach())
+    fd = os.dup(sock.fileno())
+    sock.close()
+    return Connection(fd)
+
+def _reap(proc, conn):
+    """
+    Reclaim the resources of a forked process: close the parent's
+    end of the pipe and join the process. If the process is still
+    running, nobody is interested in it's result any more (this is
+    called when it's promise is dropped before the result came in),
+    so it is killed.
+    """
+
+    conn.close()
+    if proc.is_alive():
+        proc.terminate()
+    proc.join()
+    close = getattr(proc, 'close', None)
+    if close is not None:
+        close()
+
 # It's awful, but works in Python 2 and Python 3
 ForkedFuture = PromiseMetaClass('ForkedFuture', (object,), {})
 class ForkedFuture(ForkedFuture):
@@ -63,30 +110,72 @@ class ForkedFuture(ForkedFuture):
         result with a queue so that somebody trying to force the
         value will block until we are complete. If the process
         get's an exception, store that for raising on force.
+
+        The sending end of the pipe is only needed in the child, so
+        the parent closes it's copy right away. The thunk doesn't
+        reference the future itself, so an unforced future can be
+        collected and reaped as soon as it is dropped.
         """
 
         def thunk():
+            started = time.time()
             try:
                 res = func(*args, **kw)
-                self.__pipe_out.send((True, res))
+                pipe_out.send((True, res, started, time.time()))
             except Exception as e:
-                self.__pipe_out.send((False, e))
+                pipe_out.send((False, e, started, time.time()))
 
-        self.__pipe_out, self.__pipe_in = Pipe()
+        if observers:
+            notify('create', self, func)
+        (pipe_in, pipe_out) = Pipe(duplex=False)
+        self.__func = func
+        self.__pipe_in = pipe_in
         self.__result = NoneSoFar
         self.__exception = NoneSoFar
         self.__proc = Process(target=thunk)
         self.__proc.start()
+        pipe_out.close()
+        self.__reaper = Finalize(self, _reap, (self.__proc, pipe_in))
+
+    def __reduce__(self):
+        """
+        A forked future is already running, so it is pickled as it's
+        value - pickling waits for the result.
+        """
+
+        return (_value, (self.__force__(),))
     
     def __force__(self):
         """
         This function returns either the value or the exception
         of the future. If the future hasn't completed yet, this
-        call will block until it has.
+        call will block until it has. Once the result is there,
+        the process is joined and the pipe is closed.
         """
 
         if self.__result is NoneSoFar and self.__exception is NoneSoFar:
-            (f, v) = self.__pipe_in.recv()
+            observed = bool(observers)
+            if observed:
+                entered = time.time()
+                notify('enter', self, self.__func, time=entered)
+            try:
+                (f, v, started, finished) = self.__pipe_in.recv()
+            except EOFError:
+                self.__reaper()
+                if observed:
+                    forced = time.time()
+                    notify('finish', self, self.__func, time=forced,
+                           duration=0.0, error=True)
+                    notify('force', self, self.__func, time=forced, blocked=forced-entered)
+                raise BrokenFutureError
+            self.__proc.join()
+            self.__reaper()
+            if observed:
+                forced = time.time()
+                notify('start', self, self.__func, time=started)
+                notify('finish', self, self.__func, time=finished,
+                       duration=finished-started, error=not f)
+                notify('force', self, self.__func, time=forced, blocked=forced-entered)
             if f:
                 self.__result = v
             else:
@@ -95,4 +184,334 @@ class ForkedFuture(ForkedFuture):
             return self.__result
         elif self.__exception is not NoneSoFar:
             raise self.__exception
-    
+
+
+# It's awful, but works in Python 2 and Python 3
+ForkedStream = PromiseMetaClass('ForkedStream', (object,), {})
+class ForkedStream(ForkedStream):
+
+    """
+    This class builds streaming forked futures. It is meant for
+    functions that return generators (or any other iterable): the
+    function is run in a separate process like with ForkedFuture,
+    but instead of sending the whole result back at the end, the
+    yielded items are sent back in batches while they are produced.
+
+    Forcing the stream gives an iterator that consumes those batches
+    lazily. At most __maxbatches__ batches of __batchsize__ items are
+    buffered between the processes - if the consumer falls behind,
+    the producer blocks until it catches up. So producer and consumer
+    run in parallel and memory use in the parent stays flat. Override
+    those two attributes in a subclass to tune the buffering.
+
+    Since the items come from a generator, the stream can only be
+    consumed once. Forcing it again returns the same, partially
+    consumed iterator. An exception raised by the generator is
+    reraised in the consumer after the items yielded before it.
+    """
+
+    __delayclass__ = Promise
+    __batchsize__ = 64
+    __maxbatches__ = 4
+
+    def __init__(self, func, args, kw):
+        """
+        Start a process that runs the function and sends it's items
+        in batches through a pipe. Every batch needs a credit from
+        a semaphore, the consumer gives the credit back when it takes
+        the batch out of the pipe. The process is reaped at the end of
+        the stream - or killed if the stream is dropped before that
+        (or is still unconsumed at exit), since it might wait for
+        credits that never come.
+        """
+
+        batchsize = self.__batchsize__
+
+        def send(batch):
+            credits.acquire()
+            pipe_out.send((True, batch))
+
+        def thunk():
+            batch = []
+            try:
+                for item in func(*args, **kw):
+                    batch.append(item)
+                    if len(batch) >= batchsize:
+                        send(batch)
+                        batch = []
+            except Exception as e:
+                if batch:
+                    send(batch)
+                pipe_out.send((False, e))
+            else:
+                if batch:
+                    send(batch)
+                pipe_out.send((True, None))
+
+        (pipe_in, pipe_out) = Pipe(duplex=False)
+        credits = Semaphore(self.__maxbatches__)
+        self.__pipe_in = pipe_in
+        self.__credits = credits
+        self.__result = NoneSoFar
+        self.__proc = Process(target=thunk)
+        self.__proc.start()
+        pipe_out.close()
+        self.__reaper = Finalize(self, _reap, (self.__proc, pipe_in),
+                                 exitpriority=0)
+
+    def __iterate(self):
+        """
+        This generator receives the batches from the producing
+        process and yields their items. A batch of None marks
+        the end of the stream, the process is joined then.
+        """
+
+        while True:
+            try:
+                (f, v) = self.__pipe_in.recv()
+            except EOFError:
+                self.__reaper()
+                raise BrokenFutureError
+            if not f or v is None:
+                self.__proc.join()
+                self.__reaper()
+            if not f:
+                raise v
+            if v is None:
+                return
+            self.__credits.release()
+            for item in v:
+                yield item
+
+    def __force__(self):
+        """
+        This function returns the iterator over the streamed items.
+        It doesn't block - only consuming the iterator will wait for
+        the producer if it isn't fast enough.
+        """
+
+        if self.__result is NoneSoFar:
+            self.__result = self.__iterate()
+        return self.__result
+
+
+def _send(ctl, msg):
+    """
+    Send a message to the process of a dataflow future, if it is
+    still there to listen.
+    """
+
+    try:
+        ctl.send(msg)
+    except (IOError, OSError, ValueError):
+        pass
+
+def _release(proc, ctl, deps, token):
+    """
+    Tell the dataflow futures we depend on that we are done with
+    them, release our own process and reap it. This is called when
+    a dataflow future is dropped - if it's process is still busy,
+    it is killed like any other dropped forked process.
+    """
+
+    for dep in deps:
+        _send(dep, ('done', token))
+    _send(ctl, 'release')
+    _reap(proc, ctl)
+
+def _dependencies(obj, deps):
+    """
+    Collect all dataflow futures in obj into the deps dictionary.
+    Lists, tuples, sets and dictionary values are searched, too.
+    """
+
+    if isinstance(obj, ForkedDataflowFuture):
+        deps[id(obj)] = obj
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            _dependencies(item, deps)
+    elif isinstance(obj, dict):
+        for item in obj.values():
+            _dependencies(item, deps)
+    return deps
+
+# It's awful, but works in Python 2 and Python 3
+ForkedDataflowFuture = PromiseMetaClass('ForkedDataflowFuture', (object,), {})
+class ForkedDataflowFuture(ForkedDataflowFuture):
+
+    """
+    This class builds forked futures that can be passed as arguments
+    to other forked futures of this class without routing their
+    results through the parent process.
+
+    Every dataflow future serves it's result over a unix socket once
+    it is computed. If another dataflow future is created with it
+    as an argument (or keyword argument), the parent only registers
+    the new consumer with the producing process. The consuming process
+    then fetches the value directly from the producer. So the parent
+    only coordinates the graph of futures, the results only pass
+    through it if the parent forces them itself.
+
+    Dataflow futures passed directly as arguments are fetched before
+    the function runs. Dataflow futures inside lists, tuples, sets or
+    dictionaries passed as arguments are registered, too, but stay
+    promises that are fetched when the function forces them. Dataflow
+    futures hidden in other objects are not found - force those in
+    the parent before passing them on.
+
+    The producing process stays around until the parent either forced
+    it or dropped it and until all registered consumers are done with
+    it - a consumer is done when it got it's copy, when the parent got
+    the consumer's result or when the consumer was dropped. Arguments
+    that are dataflow futures already forced in the parent are just
+    passed on as values.
+    """
+
+    __delayclass__ = Promise
+
+    def __init__(self, func, args, kw):
+        """
+        Register this future with all the dataflow futures it depends
+        on and start a process for the function. The process binds
+        the socket to serve the result before the parent continues,
+        so consumers can connect to it at any time.
+
+        The parent's end of the control pipe is closed in all forked
+        children, so the process sees the end of the pipe if the
+        parent goes away and can exit.
+        """
+
+        token = (os.getpid(), next(_tokens))
+        deps = _dependencies((list(args), kw), {}).values()
+        deps = [dep for dep in deps if dep.__register(token)]
+
+        def resolve(arg):
+            if isinstance(arg, ForkedDataflowFuture):
+                return force(arg)
+            return arg
+
+        def thunk():
+            global _consumer
+            _consumer = token
+            ctl.close()
+            try:
+                res = (True, func(*[resolve(arg) for arg in args],
+                                  **dict([(k, resolve(v)) for (k, v) in kw.items()])))
+            except Exception as e:
+                res = (False, e)
+            try:
+                pending = set()
+                released = False
+                while not released or pending:
+                    (ready, _, _) = select.select([ctl_child, listener], [], [])
+                    try:
+                        while ctl_child.poll():
+                            msg = ctl_child.recv()
+                            if msg == 'result':
+                                ctl_child.send(res)
+                            elif msg == 'release':
+                                released = True
+                            elif msg[0] == 'serve':
+                                pending.add(msg[1])
+                            elif msg[0] == 'done':
+                                pending.discard(msg[1])
+                    except EOFError:
+                        break
+                    if listener in ready:
+                        (sock, _) = listener.accept()
+                        conn = _connection(sock)
+                        try:
+                            pending.discard(conn.recv())
+                            conn.send(res)
+                        except (EOFError, IOError, OSError):
+                            pass
+                        conn.close()
+            finally:
+                listener.close()
+                os.unlink(address)
+
+        address = arbitrary_address('AF_UNIX')
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(address)
+        listener.listen(16)
+        (ctl, ctl_child) = Pipe()
+
+        self.__owner = os.getpid()
+        self.__address = address
+        self.__ctl = ctl
+        self.__token = token
+        self.__deps = [dep.__ctl for dep in deps]
+        self.__result = NoneSoFar
+        self.__exception = NoneSoFar
+        self.__proc = Process(target=thunk)
+        self.__proc.start()
+        listener.close()
+        ctl_child.close()
+        register_after_fork(ctl, ctl.__class__.close)
+        self.__finalizer = Finalize(self, _release,
+                                    (self.__proc, ctl, self.__deps, token),
+                                    exitpriority=0)
+
+    def __register(self, token):
+        """
+        Register a consumer with the producing process. If we are
+        not in the process that created this future, we can't talk
+        to the producer - in that case the value is just fetched here
+        and passed on to the consumer as a forced value. Returns
+        wether the consumer was registered.
+        """
+
+        if self.__result is not NoneSoFar or self.__exception is not NoneSoFar:
+            return False
+        if os.getpid() == self.__owner:
+            self.__ctl.send(('serve', token))
+            return True
+        self.__fetch()
+        return False
+
+    def __fetch(self):
+        """
+        Get the result from the producing process. The creator asks
+        over the control pipe and releases the process afterwards,
+        it tells the futures we depend on that we are done with them,
+        too. Everybody else connects to the result socket.
+        """
+
+        try:
+            if os.getpid() == self.__owner:
+                try:
+                    self.__ctl.send('result')
+                    (f, v) = self.__ctl.recv()
+                finally:
+                    for dep in self.__deps:
+                        _send(dep, ('done', self.__token))
+                    _send(self.__ctl, 'release')
+            else:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.connect(self.__address)
+                conn = _connection(sock)
+                try:
+                    conn.send(_consumer)
+                    (f, v) = conn.recv()
+                finally:
+                    conn.close()
+        except (EOFError, IOError, OSError):
+            raise BrokenFutureError
+        if f:
+            self.__result = v
+        else:
+            self.__exception = v
+
+    def __force__(self):
+        """
+        This function returns either the value or the exception
+        of the future. If the future hasn't completed yet, this
+        call will block until it has.
+        """
+
+        if self.__result is NoneSoFar and self.__exception is NoneSoFar:
+            self.__fetch()
+        if self.__result is not NoneSoFar:
+            return self.__result
+        elif self.__exception is not NoneSoFar:
+            raise self.__exception
@@ -27,7 +27,6 @@ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 from lazypy.Promises import Promise
 from lazypy.Futures import Future
-from lazypy.ForkedFutures import ForkedFuture
 
 __all__ = ["delay",
            "lazy",
@@ -92,26 +91,29 @@ def future(func, futureclass=Future):
 
     def future_func(*args, **kw):
         return futureclass(func, args, kw)
-    lazy_func.__doc__ = func.__doc__
+    future_func.__doc__ = func.__doc__
 
     return future_func
 
-def fork(func, args=None, kw=None, futureclass=ForkedFuture):
+def fork(func, args=None, kw=None, futureclass=None):
 
     """
     This is a parallel variant on the apply function. It returns a future
     for the function call that will be evaluated in the background. You can
     override the class to be used for the future. It uses forked futures
-    by default.
+    by default - the ForkedFutures module is only imported when needed,
+    since it pulls in multiprocessing.
     """
 
     if args is None: 
     	args = []
     if kw is None: 
     	kw = {}
+    if futureclass is None:
+        from lazypy.ForkedFutures import ForkedFuture as futureclass
     return futureclass(func, args, kw)
 
-def forked(func, futureclass=ForkedFuture):
+def forked(func, futureclass=None):
 
     """
     This function returns a future variant on the passed in function.
@@ -122,8 +124,8 @@ def forked(func, futureclass=ForkedFuture):
     """
 
     def future_func(*args, **kw):
-        return futureclass(func, args, kw)
-    lazy_func.__doc__ = func.__doc__
+        return fork(func, args, kw, futureclass)
+    future_func.__doc__ = func.__doc__
 
     return future_func
 
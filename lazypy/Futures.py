@@ -25,9 +25,10 @@ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
+import time
 from threading import Condition, Thread
-from lazypy.Promises import Promise, PromiseMetaClass
-from lazypy.Utils import NoneSoFar
+from lazypy.Promises import Promise, PromiseMetaClass, _value
+from lazypy.Utils import NoneSoFar, observers, notify
 
 __all__ = ["Future",
           ]
@@ -79,13 +80,26 @@ class Future(Future):
             self.__sync.acquire()
             try:
                 self.__sync.notify()
+                if observed:
+                    started = time.time()
+                    notify('start', self, func, time=started)
                 try:
                     self.__result = func(*args, **kw)
                 except Exception as e:
                     self.__exception = e
+                if observed:
+                    finished = time.time()
+                    notify('finish', self, func, time=finished,
+                           duration=finished-started,
+                           error=self.__exception is not NoneSoFar)
             finally:
                 self.__sync.release()
 
+        observed = bool(observers)
+        if observed:
+            notify('create', self, func)
+        self.__func = func
+        self.__forced = False
         self.__result = NoneSoFar
         self.__exception = NoneSoFar
         self.__sync = Condition()
@@ -96,7 +110,15 @@ class Future(Future):
             self.__sync.wait()
         finally:
             self.__sync.release()
-    
+
+    def __reduce__(self):
+        """
+        A future is already running, so it is pickled as it's value -
+        pickling waits for the result.
+        """
+
+        return (_value, (self.__force__(),))
+
     def __force__(self):
         """
         This function returns either the value or the exception
@@ -104,7 +126,15 @@ class Future(Future):
         call will block until it has.
         """
 
-        self.__sync.acquire()
+        if observers and not self.__forced:
+            entered = time.time()
+            notify('enter', self, self.__func, time=entered)
+            self.__sync.acquire()
+            self.__forced = True
+            forced = time.time()
+            notify('force', self, self.__func, time=forced, blocked=forced-entered)
+        else:
+            self.__sync.acquire()
         try:
             if self.__result is not NoneSoFar:
                 return self.__result
@@ -0,0 +1,138 @@
+"""
+Lazy Evaluation for Python - main package with primary exports
+
+Copyright (c) 2004, Georg Bauer <gb@murphy.bofh.ms>, 
+Copyright (c) 2011, Alexander Marshalov <alone.amper@gmail.com>, 
+except where the file explicitly names other copyright holders and licenses.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of 
+this software and associated documentation files (the "Software"), to deal in 
+the Software without restriction, including without limitation the rights to 
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ 
+the Software, and to permit persons to whom the Software is furnished to do so, 
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all 
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ 
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR 
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER 
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN 
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import threading
+from lazypy.Promises import Promise, PromiseMetaClass, _value
+from lazypy.PoolFutures import _pool, _run
+from lazypy.Serialization import dumps
+from lazypy.Utils import NoneSoFar
+
+try:
+    from concurrent.futures import InterpreterPoolExecutor
+except ImportError:
+    InterpreterPoolExecutor = None
+
+__all__ = ["InterpreterFuture",
+           "interpreters",
+          ]
+
+# True if this Python has subinterpreters with their own GIL that
+# concurrent.futures can run code in (CPython 3.14 and later).
+interpreters = InterpreterPoolExecutor is not None
+
+_executors = {}
+_lock = threading.Lock()
+
+def _executor(size):
+    """
+    Return the shared interpreter pool of the given size, starting it
+    on first use.
+    """
+
+    _lock.acquire()
+    try:
+        executor = _executors.get(size)
+        if executor is None:
+            executor = _executors[size] = InterpreterPoolExecutor(size)
+        return executor
+    finally:
+        _lock.release()
+
+# It's awful, but works in Python 2 and Python 3
+InterpreterFuture = PromiseMetaClass('InterpreterFuture', (object,), {})
+class InterpreterFuture(InterpreterFuture):
+
+    """
+    This class builds futures that run in a shared pool of
+    subinterpreters. Every subinterpreter has it's own GIL, so CPU
+    bound thunks run in parallel like with ForkedFuture, but without
+    starting processes. All interpreter futures with the same
+    __poolsize__ share one pool (None is the number of CPUs).
+
+    The thunk is pickled into the subinterpreter (with cloudpickle if
+    it is installed) and the result is pickled back, so both have to
+    be picklable and the modules the thunk uses must be importable in
+    a fresh interpreter - extension modules that don't support
+    subinterpreters can't be used.
+
+    On Pythons without InterpreterPoolExecutor (before 3.14) the
+    futures run on the shared process pool of ForkedPoolFuture
+    instead. lazypy.InterpreterFutures.interpreters tells you which
+    one you get, and backend() tells you for a single future.
+    """
+
+    __delayclass__ = Promise
+    __poolsize__ = None
+
+    def __init__(self, func, args, kw):
+        """
+        Queue the pickled thunk on the pool.
+        """
+
+        data = dumps((func, list(args), dict(kw)))
+        if interpreters:
+            self.__get = _executor(self.__poolsize__).submit(_run, data).result
+            self.__backend = 'interpreters'
+        else:
+            self.__get = _pool(True, self.__poolsize__).apply_async(_run, (data,)).get
+            self.__backend = 'processes'
+        self.__result = NoneSoFar
+        self.__exception = NoneSoFar
+
+    def backend(self):
+        """
+        Return 'interpreters' or 'processes', depending on where the
+        future runs.
+        """
+
+        return self.__backend
+
+    def __reduce__(self):
+        """
+        A future is already running, so it is pickled as it's value -
+        pickling waits for the result.
+        """
+
+        return (_value, (self.__force__(),))
+
+    def __force__(self):
+        """
+        This function returns either the value or the exception
+        of the future. If the future hasn't completed yet, this
+        call will block until it has.
+        """
+
+        if self.__result is NoneSoFar and self.__exception is NoneSoFar:
+            try:
+                self.__result = self.__get()
+            except Exception as e:
+                self.__exception = e
+            self.__get = None
+        if self.__result is not NoneSoFar:
+            return self.__result
+        elif self.__exception is not NoneSoFar:
+            raise self.__exception
@@ -29,18 +29,135 @@ import types
 
 from lazypy.Promises import Promise
 from lazypy.Functions import lazy
+from lazypy.PoolFutures import PoolFuture, ForkedPoolFuture
 
 __all__ = ["LazyEvaluatedMetaClass",
            "LazyEvaluated",
+           "lazyattribute",
+           "memoized",
+           "reset",
+           "background",
+           "FutureEvaluatedMetaClass",
+           "FutureEvaluated",
+           "ForkEvaluatedMetaClass",
+           "ForkEvaluated",
           ]
 
+def _cache(obj):
+    """
+    Return the per instance cache of lazy attributes and memoized
+    methods, creating it on first use. It lives in the __lazycache__
+    attribute - a slot, if the class uses __slots__.
+    """
+
+    try:
+        return obj.__lazycache__
+    except AttributeError:
+        cache = {}
+        obj.__lazycache__ = cache
+        return cache
+
+def _promiseclass(obj):
+    return getattr(obj.__class__, '__promiseclass__', Promise)
+
+class lazyattribute(object):
+
+    """
+    This decorator turns a method without arguments into a lazily
+    computed attribute. Reading the attribute gives a promise for
+    the method's result. The promise is cached per instance, so the
+    method runs at most once - and not at all if the value is never
+    used - until the cache is cleared with reset.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.__name__ = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj, klass=None):
+        if obj is None:
+            return self
+        cache = _cache(obj)
+        key = self.__name__
+        if key not in cache:
+            cache[key] = _promiseclass(obj)(self.func, (obj,), {})
+        return cache[key]
+
+class memoized(object):
+
+    """
+    This decorator turns a method into a memoized lazy method. Every
+    call gives a promise like with lazy methods, but calls with equal
+    arguments on the same instance give the same promise, so the
+    method only runs once for them. Calls with unhashable arguments
+    are not cached. Use reset to clear the cache.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.__name__ = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj, klass=None):
+        if obj is None:
+            return self
+        func = self.func
+        name = self.__name__
+
+        def memoized_method(*args, **kw):
+            key = (name, args, tuple(sorted(kw.items())))
+            cache = _cache(obj)
+            try:
+                return cache[key]
+            except KeyError:
+                res = cache[key] = _promiseclass(obj)(func, (obj,)+args, kw)
+            except TypeError:
+                res = _promiseclass(obj)(func, (obj,)+args, kw)
+            return res
+        memoized_method.__doc__ = func.__doc__
+
+        return memoized_method
+
+def reset(obj, *names):
+    """
+    Clear the cached lazy attributes and memoized methods of obj. If
+    names are given, only the cache entries of those attributes and
+    methods are cleared. The next access computes them again.
+    """
+
+    cache = _cache(obj)
+    if not names:
+        cache.clear()
+    else:
+        for key in list(cache.keys()):
+            if key in names or (isinstance(key, tuple) and key[0] in names):
+                del cache[key]
+
 class LazyEvaluatedMetaClass(type):
 
     """
     This meta class rewrites all function attributes to not directly
     run but to yield a generator that will run the function later on.
+
+    Methods decorated with lazyattribute or memoized keep their
+    decorator. If the class defines __slots__, a __lazycache__ slot
+    is added for their per instance cache.
     """
 
+    def __new__(meta, name, bases, attributes):
+        slots = attributes.get('__slots__')
+        if slots is not None:
+            if isinstance(slots, str):
+                slots = (slots,)
+            cached = [v for v in attributes.values()
+                      if isinstance(v, (lazyattribute, memoized))]
+            inherited = [b for b in bases if hasattr(b, '__lazycache__')]
+            if cached and not inherited and '__lazycache__' not in slots:
+                attributes = dict(attributes)
+                attributes['__slots__'] = tuple(slots) + ('__lazycache__',)
+        return super(LazyEvaluatedMetaClass, meta).__new__(meta, name, bases, attributes)
+
     def __init__(cls, name, bases, attributes):
         promiseclass = getattr(cls, '__promiseclass__', Promise)
         for (k, v) in attributes.items():
@@ -49,14 +166,139 @@ class LazyEvaluatedMetaClass(type):
         super(LazyEvaluatedMetaClass, cls).__init__(name, bases, attributes)
 
 # It's awful, but works in Python 2 and Python 3
-LazyEvaluated = LazyEvaluatedMetaClass('LazyEvaluated', (object,), {})
+LazyEvaluated = LazyEvaluatedMetaClass('LazyEvaluated', (object,), {'__slots__': ()})
 class LazyEvaluated(LazyEvaluated):
 
     """
     This is the base class for all classes that should evaluate in
     a lazy fashion. You can overload __promiseclass__ if you want to
-    have different promise handling in your code.
+    have different promise handling in your code. It has no instance
+    dictionary of it's own, so subclasses can use __slots__.
     """
 
+    __slots__ = ()
     __promiseclass__ = Promise
 
+class _Background(object):
+
+    """
+    This is what the background decorator puts into the class. The
+    future evaluating meta classes replace it with the real method.
+    In other classes it works as a descriptor on it's own, using the
+    class' __futureclass__ or PoolFuture.
+    """
+
+    def __init__(self, func, futureclass):
+        self.func = func
+        self.futureclass = futureclass
+        self.__name__ = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj, klass=None):
+        if obj is None:
+            return self
+        futureclass = self.futureclass or getattr(klass, '__futureclass__', PoolFuture)
+        func = self.func
+
+        def background_method(*args, **kw):
+            return futureclass(func, (obj,)+args, kw)
+        background_method.__doc__ = func.__doc__
+
+        return background_method
+
+def background(func, futureclass=None):
+    """
+    This decorator marks a method to run in the background. Every call
+    returns a future for the result instead of the result. The class
+    of the future is taken from the __futureclass__ of the class,
+    unless you pass one to the decorator:
+
+        @background
+        def fetch(self, url): ...
+
+        @background(ForkedPoolFuture)
+        def crunch(self, data): ...
+    """
+
+    if isinstance(func, type):
+        return lambda f: _Background(f, func)
+    return _Background(func, futureclass)
+
+def _call_method(klass, name, obj, *args, **kw):
+    """
+    Call the original function of a background method. This is what
+    is sent to the pool, so only the class, the name and the instance
+    need to be pickled for process pools - not the function itself.
+    """
+
+    return getattr(klass, name).__wrapped__(obj, *args, **kw)
+
+def _background_method(klass, name, func, futureclass):
+    """
+    Build the method that replaces a background decorated function
+    in a future evaluated class.
+    """
+
+    def background_method(self, *args, **kw):
+        return futureclass(_call_method, (klass, name, self)+args, kw)
+    background_method.__doc__ = func.__doc__
+    background_method.__name__ = func.__name__
+    background_method.__wrapped__ = func
+
+    return background_method
+
+class FutureEvaluatedMetaClass(type):
+
+    """
+    This meta class rewrites all methods decorated with background to
+    run on a pool and return a future. Other methods are left alone,
+    so a class can pick the methods that are worth to run in parallel
+    (usually those waiting on I/O) and callers don't have to change -
+    they get futures that behave like the results. The future class
+    is __futureclass__, PoolFuture by default.
+    """
+
+    __futureclass__ = PoolFuture
+
+    def __init__(cls, name, bases, attributes):
+        default = cls.__futureclass__
+        for (k, v) in attributes.items():
+            if isinstance(v, _Background):
+                setattr(cls, k, _background_method(cls, k, v.func,
+                                                   v.futureclass or default))
+        super(FutureEvaluatedMetaClass, cls).__init__(name, bases, attributes)
+
+class ForkEvaluatedMetaClass(FutureEvaluatedMetaClass):
+
+    """
+    This is the variant of FutureEvaluatedMetaClass that runs
+    background methods on a shared process pool by default. The
+    instances have to be picklable for that.
+    """
+
+    __futureclass__ = ForkedPoolFuture
+
+# It's awful, but works in Python 2 and Python 3
+FutureEvaluated = FutureEvaluatedMetaClass('FutureEvaluated', (object,), {'__slots__': ()})
+class FutureEvaluated(FutureEvaluated):
+
+    """
+    This is the base class for classes with background methods that
+    run on a shared thread pool. Overload __futureclass__ to use a
+    different future class.
+    """
+
+    __slots__ = ()
+    __futureclass__ = PoolFuture
+
+# It's awful, but works in Python 2 and Python 3
+ForkEvaluated = ForkEvaluatedMetaClass('ForkEvaluated', (object,), {'__slots__': ()})
+class ForkEvaluated(ForkEvaluated):
+
+    """
+    This is the base class for classes with background methods that
+    run on a shared process pool.
+    """
+
+    __slots__ = ()
+    __futureclass__ = ForkedPoolFuture
@@ -0,0 +1,189 @@
+"""
+Lazy Evaluation for Python - main package with primary exports
+
+Copyright (c) 2004, Georg Bauer <gb@murphy.bofh.ms>, 
+Copyright (c) 2011, Alexander Marshalov <alone.amper@gmail.com>, 
+except where the file explicitly names other copyright holders and licenses.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of 
+this software and associated documentation files (the "Software"), to deal in 
+the Software without restriction, including without limitation the rights to 
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ 
+the Software, and to permit persons to whom the Software is furnished to do so, 
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all 
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ 
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR 
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER 
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN 
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+try:
+    from collections.abc import MutableMapping, MutableSequence
+except ImportError:
+    from collections import MutableMapping, MutableSequence
+from lazypy.Promises import force
+
+__all__ = ["LazyDict",
+           "LazyList",
+          ]
+
+def _pending(value):
+    """
+    Return True if value is a promise that still has to be forced
+    before it can be handed out.
+    """
+
+    return getattr(value, '__force__', None) is not None
+
+def _prefetch(data, keys, futureclass):
+    """
+    Force the promises in data under keys concurrently, each in a
+    future of futureclass, and store the values in place.
+    """
+
+    if futureclass is None:
+        from lazypy.PoolFutures import PoolFuture as futureclass
+    futures = []
+    for key in keys:
+        value = data[key]
+        if _pending(value):
+            futures.append((key, value, futureclass(force, (value,), {})))
+    for (key, value, future) in futures:
+        result = force(future)
+        if data[key] is value:
+            data[key] = result
+
+class LazyDict(MutableMapping):
+
+    """
+    A dictionary whose values may be promises. A promise is forced when
+    it's key is accessed and the value replaces the promise, so it is
+    only forced once. Keys, len() and membership tests never force
+    anything, so even huge tables of delayed values are cheap to walk.
+
+    prefetch(keys) forces a group of values concurrently on a pool of
+    futures (PoolFuture by default, pass ForkedPoolFuture to compute
+    them in other processes), so the following accesses don't have to
+    wait for them one by one.
+    """
+
+    def __init__(self, *args, **kw):
+        self.__data = dict(*args, **kw)
+
+    def __getitem__(self, key):
+        value = self.__data[key]
+        if _pending(value):
+            value = self.__data[key] = force(value)
+        return value
+
+    def __setitem__(self, key, value):
+        self.__data[key] = value
+
+    def __delitem__(self, key):
+        del self.__data[key]
+
+    def __iter__(self):
+        return iter(self.__data)
+
+    def __len__(self):
+        return len(self.__data)
+
+    def __contains__(self, key):
+        return key in self.__data
+
+    def __repr__(self):
+        return 'LazyDict(%r)' % (self.__data,)
+
+    def raw(self, key):
+        """
+        Return what is stored under key - the promise, if it wasn't
+        forced yet.
+        """
+
+        return self.__data[key]
+
+    def pending(self):
+        """
+        Return the list of keys whose values are still promises.
+        """
+
+        return [key for (key, value) in self.__data.items() if _pending(value)]
+
+    def prefetch(self, keys=None, futureclass=None):
+        """
+        Force the values of keys (all pending ones by default)
+        concurrently with futures of futureclass.
+        """
+
+        if keys is None:
+            keys = self.pending()
+        _prefetch(self.__data, keys, futureclass)
+
+class LazyList(MutableSequence):
+
+    """
+    A list whose items may be promises, with the same behaviour as
+    LazyDict: items are forced on access and replaced by their value,
+    len() never forces anything and prefetch(indices) forces a group of
+    items concurrently. Slicing gives a new LazyList of the same items
+    without forcing them. Iterating forces each item when it is reached.
+    """
+
+    def __init__(self, items=()):
+        self.__data = list(items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return LazyList(self.__data[index])
+        value = self.__data[index]
+        if _pending(value):
+            value = self.__data[index] = force(value)
+        return value
+
+    def __setitem__(self, index, value):
+        self.__data[index] = value
+
+    def __delitem__(self, index):
+        del self.__data[index]
+
+    def __len__(self):
+        return len(self.__data)
+
+    def insert(self, index, value):
+        self.__data.insert(index, value)
+
+    def __repr__(self):
+        return 'LazyList(%r)' % (self.__data,)
+
+    def raw(self, index):
+        """
+        Return what is stored at index - the promise, if it wasn't
+        forced yet.
+        """
+
+        return self.__data[index]
+
+    def pending(self):
+        """
+        Return the list of indices whose items are still promises.
+        """
+
+        return [index for (index, value) in enumerate(self.__data) if _pending(value)]
+
+    def prefetch(self, indices=None, futureclass=None):
+        """
+        Force the items at indices (all pending ones by default)
+        concurrently with futures of futureclass.
+        """
+
+        if indices is None:
+            indices = self.pending()
+        _prefetch(self.__data, indices, futureclass)
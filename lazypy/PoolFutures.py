@@ -0,0 +1,134 @@
+"""
+Lazy Evaluation for Python - main package with primary exports
+
+Copyright (c) 2004, Georg Bauer <gb@murphy.bofh.ms>, 
+Copyright (c) 2011, Alexander Marshalov <alone.amper@gmail.com>, 
+except where the file explicitly names other copyright holders and licenses.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of 
+this software and associated documentation files (the "Software"), to deal in 
+the Software without restriction, including without limitation the rights to 
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ 
+the Software, and to permit persons to whom the Software is furnished to do so, 
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all 
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ 
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR 
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER 
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN 
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import pickle
+import threading
+from lazypy.Promises import Promise, PromiseMetaClass, _value
+from lazypy.Utils import NoneSoFar
+from lazypy.Serialization import dumps
+
+__all__ = ["PoolFuture",
+           "ForkedPoolFuture",
+          ]
+
+_pools = {}
+_lock = threading.Lock()
+
+def _pool(forked, size):
+    """
+    Return the shared pool of the given kind and size, starting it
+    on first use. multiprocessing is only imported then.
+    """
+
+    _lock.acquire()
+    try:
+        pool = _pools.get((forked, size))
+        if pool is None:
+            if forked:
+                from multiprocessing import Pool as pool
+            else:
+                from multiprocessing.pool import ThreadPool as pool
+            pool = _pools[(forked, size)] = pool(size)
+        return pool
+    finally:
+        _lock.release()
+
+def _run(data):
+    """
+    Run a pickled thunk in a worker of a process pool.
+    """
+
+    (func, args, kw) = pickle.loads(data)
+    return func(*args, **kw)
+
+# It's awful, but works in Python 2 and Python 3
+PoolFuture = PromiseMetaClass('PoolFuture', (object,), {})
+class PoolFuture(PoolFuture):
+
+    """
+    This class builds futures that run on a shared pool of threads
+    instead of starting a thread of their own. All pool futures with
+    the same __poolsize__ share one pool (None is the number of CPUs),
+    so starting lots of them is cheap and only __poolsize__ of them
+    run at the same time - the others wait in the pool's queue.
+    Exceptions are reraised on force, like with Future.
+    """
+
+    __delayclass__ = Promise
+    __forked__ = False
+    __poolsize__ = None
+
+    def __init__(self, func, args, kw):
+        """
+        Queue the function on the pool.
+        """
+
+        pool = _pool(self.__forked__, self.__poolsize__)
+        if self.__forked__:
+            self.__async = pool.apply_async(_run, (dumps((func, list(args), dict(kw))),))
+        else:
+            self.__async = pool.apply_async(func, args, kw)
+        self.__result = NoneSoFar
+        self.__exception = NoneSoFar
+
+    def __reduce__(self):
+        """
+        A future is already running, so it is pickled as it's value -
+        pickling waits for the result.
+        """
+
+        return (_value, (self.__force__(),))
+
+    def __force__(self):
+        """
+        This function returns either the value or the exception
+        of the future. If the future hasn't completed yet, this
+        call will block until it has.
+        """
+
+        if self.__result is NoneSoFar and self.__exception is NoneSoFar:
+            try:
+                self.__result = self.__async.get()
+            except Exception as e:
+                self.__exception = e
+            self.__async = None
+        if self.__result is not NoneSoFar:
+            return self.__result
+        elif self.__exception is not NoneSoFar:
+            raise self.__exception
+
+class ForkedPoolFuture(PoolFuture):
+
+    """
+    This class builds futures that run on a shared pool of processes,
+    to get around the GIL like ForkedFuture does, but without forking
+    a process for every call. The thunk is pickled to get it to the
+    pool (with cloudpickle if it is installed, so closures and lambdas
+    work, too), the result is pickled to get it back.
+    """
+
+    __forked__ = True
@@ -0,0 +1,701 @@
+"""
+Lazy Evaluation for Python - main package with primary exports
+
+Copyright (c) 2004, Georg Bauer <gb@murphy.bofh.ms>, 
+Copyright (c) 2011, Alexander Marshalov <alone.amper@gmail.com>, 
+except where the file explicitly names other copyright holders and licenses.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of 
+this software and associated documentation files (the "Software"), to deal in 
+the Software without restriction, including without limitation the rights to 
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ 
+the Software, and to permit persons to whom the Software is furnished to do so, 
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all 
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ 
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR 
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER 
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN 
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import json
+import os
+import sys
+import threading
+import weakref
+from lazypy.Utils import observers
+
+__all__ = ["Profiler",
+           "CriticalPath",
+           "Audit",
+          ]
+
+_package = os.path.dirname(os.path.abspath(__file__))
+
+def _callsite():
+    """
+    Return (filename, lineno, function) of the first frame on the
+    stack that is not part of lazypy - that is where a promise is
+    forced from.
+    """
+
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if os.path.dirname(filename) != _package:
+            return (frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name)
+        frame = frame.f_back
+    return None
+
+def _name(func):
+    """
+    Return a readable name for the wrapped function of a promise.
+    """
+
+    module = getattr(func, '__module__', None)
+    name = getattr(func, '__qualname__', None) or getattr(func, '__name__', None)
+    if name is None:
+        name = repr(func)
+    if module:
+        return '%s.%s' % (module, name)
+    return name
+
+class Profiler(object):
+
+    """
+    A profiler records the life cycle of promises, futures and forked
+    futures while it is started: when they were created, how long they
+    waited in the queue before the computation started, how long the
+    computation took, how long the first force call blocked and where
+    it came from. stats() aggregates the records per wrapped function
+    and chrome_trace() writes them in the trace event format that
+    chrome://tracing and Perfetto read.
+
+    A profiler is an observer (see lazypy.Utils.observers), so it only
+    costs something while it is started. Use it as a context manager:
+
+        with Profiler() as prof:
+            ...
+        print(prof.stats())
+    """
+
+    def __init__(self, callsites=True):
+        self.callsites = callsites
+        self.__lock = threading.RLock()
+        self.__records = {}
+        self.__done = []
+
+    def start(self):
+        if self not in observers:
+            observers.append(self)
+        return self
+
+    def stop(self):
+        if self in observers:
+            observers.remove(self)
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def __dropped(self, key, ref):
+        """
+        The weakref callback for promises that went away unforced.
+        """
+
+        self.__lock.acquire()
+        try:
+            entry = self.__records.get(key)
+            if entry is not None and entry[0] is ref:
+                del self.__records[key]
+        finally:
+            self.__lock.release()
+
+    def __call__(self, event, promise, func, info):
+        """
+        Record one event. The records of promises are kept by the id
+        of the promise until they are forced, so the profiler doesn't
+        keep promises alive. Records of promises that are dropped
+        without being forced are thrown away.
+        """
+
+        key = id(promise)
+        self.__lock.acquire()
+        try:
+            entry = self.__records.get(key)
+            if event == 'create' or entry is None:
+                try:
+                    ref = weakref.ref(promise, lambda ref, key=key: self.__dropped(key, ref))
+                except TypeError:
+                    ref = None
+                record = {'name': _name(func), 'created': None,
+                          'thread': threading.current_thread().ident,
+                          'pid': os.getpid()}
+                if event == 'create':
+                    record['created'] = info['time']
+                entry = self.__records[key] = (ref, record)
+            record = entry[1]
+            if event == 'enter':
+                record['entered'] = info['time']
+            elif event == 'start':
+                record['started'] = info['time']
+            elif event == 'finish':
+                record['finished'] = info['time']
+                record['duration'] = info['duration']
+                record['error'] = info['error']
+            elif event == 'force':
+                record['forced'] = info['time']
+                record['blocked'] = info['blocked']
+                if self.callsites:
+                    record['callsite'] = _callsite()
+                del self.__records[key]
+                self.__done.append(record)
+        finally:
+            self.__lock.release()
+
+    def records(self):
+        """
+        Return a list of the records of all forced promises. Each
+        record is a dictionary with the name of the function and the
+        times 'created', 'started', 'finished' and 'forced' (seconds
+        since the epoch), the 'duration' of the computation, the time
+        the force call 'blocked', the 'queued' time between creation
+        and start and the forcing 'callsite'.
+        """
+
+        self.__lock.acquire()
+        try:
+            result = [dict(record) for record in self.__done]
+        finally:
+            self.__lock.release()
+        for record in result:
+            if record.get('created') is not None and 'started' in record:
+                record['queued'] = max(record['started'] - record['created'], 0.0)
+        return result
+
+    def pending(self):
+        """
+        Return the number of promises that were created but not
+        forced yet.
+        """
+
+        self.__lock.acquire()
+        try:
+            return len(self.__records)
+        finally:
+            self.__lock.release()
+
+    def clear(self):
+        self.__lock.acquire()
+        try:
+            self.__records.clear()
+            del self.__done[:]
+        finally:
+            self.__lock.release()
+
+    def stats(self):
+        """
+        Return a dictionary with the statistics per function name: the
+        number of forced promises ('count'), the number of 'errors',
+        and the totals and maxima of compute 'duration', 'queued' and
+        'blocked' time. 'callsites' counts the places the promises of
+        the function were forced from.
+        """
+
+        stats = {}
+        for record in self.records():
+            entry = stats.get(record['name'])
+            if entry is None:
+                entry = stats[record['name']] = {
+                    'count': 0, 'errors': 0, 'callsites': {},
+                    'duration': 0.0, 'max_duration': 0.0,
+                    'queued': 0.0, 'max_queued': 0.0,
+                    'blocked': 0.0, 'max_blocked': 0.0}
+            entry['count'] += 1
+            if record.get('error'):
+                entry['errors'] += 1
+            for field in ('duration', 'queued', 'blocked'):
+                value = record.get(field) or 0.0
+                entry[field] += value
+                entry['max_' + field] = max(entry['max_' + field], value)
+            site = record.get('callsite')
+            if site is not None:
+                site = '%s:%d' % site[:2]
+                entry['callsites'][site] = entry['callsites'].get(site, 0) + 1
+        return stats
+
+    def chrome_trace(self, path_or_file):
+        """
+        Write the records as a Chrome trace JSON file. Every promise
+        gives up to three complete events: 'queue' from creation to the
+        start of the computation, 'compute' for the computation and
+        'blocked' for the time the force call waited.
+        """
+
+        events = []
+        for record in self.records():
+            args = {'callsite': record.get('callsite') and '%s:%d' % record['callsite'][:2]}
+            spans = []
+            if 'queued' in record:
+                spans.append(('queue', record['created'], record['queued']))
+            if 'started' in record and 'duration' in record:
+                spans.append(('compute', record['started'], record['duration']))
+            if 'forced' in record and 'blocked' in record:
+                spans.append(('blocked', record['forced'] - record['blocked'], record['blocked']))
+            for (cat, start, duration) in spans:
+                events.append({'name': record['name'], 'cat': cat, 'ph': 'X',
+                               'ts': start * 1e6, 'dur': duration * 1e6,
+                               'pid': record['pid'], 'tid': record['thread'],
+                               'args': args})
+        trace = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+        if hasattr(path_or_file, 'write'):
+            json.dump(trace, path_or_file)
+        else:
+            with open(path_or_file, 'w') as f:
+                json.dump(trace, f)
+
+class CriticalPath(object):
+
+    """
+    This observer records the dependency graph of promises while they
+    are forced: a promise that is forced while another one is being
+    forced or computed (an argument of a delayed function or a promise
+    forced inside the body of a future) becomes a dependency of it.
+    Every node has the measured compute duration and the times it was
+    entered, started, finished and forced.
+
+    critical_path() follows the dependency that was ready last (that
+    finished it's computation last) from a root down to the leafs -
+    that is the chain that determined the latency of the root. The
+    slack of a dependency is how much later it could have been ready
+    without delaying it's parent, so nodes with a lot of slack are not
+    worth optimizing, while independent nodes on the critical path are
+    candidates to run as futures. wasted() lists futures that were
+    computed but never forced.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        self.__ids = {}
+        self.__nodes = []
+        self.__edges = set()
+
+    def start(self):
+        if self not in observers:
+            observers.append(self)
+        return self
+
+    def stop(self):
+        if self in observers:
+            observers.remove(self)
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def __stack(self):
+        stack = getattr(self.__local, 'stack', None)
+        if stack is None:
+            stack = self.__local.stack = []
+        return stack
+
+    def __node(self, promise, func, new=False):
+        key = id(promise)
+        index = self.__ids.get(key)
+        if index is None or new:
+            index = len(self.__nodes)
+            self.__nodes.append({'id': index, 'name': _name(func), 'forced': None})
+            self.__ids[key] = index
+        return index
+
+    def __pop(self, index):
+        stack = self.__stack()
+        for pos in range(len(stack) - 1, -1, -1):
+            if stack[pos] == index:
+                del stack[pos]
+                break
+
+    def __call__(self, event, promise, func, info):
+        self.__lock.acquire()
+        try:
+            index = self.__node(promise, func, event == 'create')
+            node = self.__nodes[index]
+            stack = self.__stack()
+            if event == 'create':
+                node['created'] = info['time']
+            elif event == 'enter':
+                if stack and stack[-1] != index:
+                    self.__edges.add((stack[-1], index))
+                node['entered'] = info['time']
+                stack.append(index)
+            elif event == 'start':
+                node['started'] = info['time']
+                if not stack or stack[-1] != index:
+                    # a future computing in it's own thread
+                    stack.append(index)
+                    node['thread'] = True
+            elif event == 'finish':
+                node['finished'] = info['time']
+                node['duration'] = info['duration']
+                node['error'] = info['error']
+                if node.pop('thread', False):
+                    self.__pop(index)
+            elif event == 'force':
+                node['forced'] = info['time']
+                node['blocked'] = info['blocked']
+                self.__pop(index)
+        finally:
+            self.__lock.release()
+
+    def clear(self):
+        self.__lock.acquire()
+        try:
+            self.__ids.clear()
+            del self.__nodes[:]
+            self.__edges.clear()
+        finally:
+            self.__lock.release()
+
+    def nodes(self):
+        """
+        Return a list of dictionaries, one per recorded promise, with
+        the 'id', the function 'name', the compute 'duration' and the
+        times of the events (seconds since the epoch).
+        """
+
+        return [dict(node) for node in self.__nodes]
+
+    def edges(self):
+        """
+        Return a sorted list of (parent, dependency) pairs of node ids.
+        """
+
+        return sorted(self.__edges)
+
+    def dependencies(self, index):
+        return sorted([dep for (parent, dep) in self.__edges if parent == index])
+
+    def roots(self):
+        """
+        Return the ids of the forced nodes that are no dependency of
+        another node, the slowest root first.
+        """
+
+        deps = set([dep for (parent, dep) in self.__edges])
+        roots = [node for node in self.__nodes
+                 if node['id'] not in deps and node['forced'] is not None]
+        roots.sort(key=lambda node: -(node['forced'] - node.get('entered', node['forced'])))
+        return [node['id'] for node in roots]
+
+    def slack(self):
+        """
+        Return a dictionary mapping node ids to their slack: the time
+        between the node being ready and the last dependency of the
+        same parent being ready. Nodes on the critical path have a
+        slack of zero, roots are not in the dictionary.
+        """
+
+        slack = {}
+        parents = {}
+        for (parent, dep) in self.__edges:
+            parents.setdefault(parent, []).append(dep)
+        for (parent, deps) in parents.items():
+            ready = [_ready(self.__nodes[dep]) for dep in deps]
+            ready = [t for t in ready if t is not None]
+            if not ready:
+                continue
+            last = max(ready)
+            for dep in deps:
+                ready = _ready(self.__nodes[dep])
+                if ready is not None:
+                    value = last - ready
+                    slack[dep] = min(slack.get(dep, value), value)
+        return slack
+
+    def critical_path(self, root=None):
+        """
+        Return the list of node dictionaries on the critical path from
+        root (the slowest root by default) down to a leaf. Each node
+        has the 'slack' it's parent had to spare, which is zero for all
+        but the root.
+        """
+
+        if root is None:
+            roots = self.roots()
+            if not roots:
+                return []
+            root = roots[0]
+        path = []
+        seen = set()
+        while root is not None and root not in seen:
+            seen.add(root)
+            path.append(dict(self.__nodes[root]))
+            deps = [dep for dep in self.dependencies(root)
+                    if self.__nodes[dep]['forced'] is not None]
+            root = deps and max(deps, key=lambda dep: _ready(self.__nodes[dep])) or None
+        return path
+
+    def summary(self, root=None):
+        """
+        Return a dictionary with the 'latency' of the root (from
+        entering the first force to getting the value), the compute
+        'work' of all forced nodes, the compute time on the critical 'path'
+        and the 'parallelism' (work divided by path) - the speedup
+        you could get at most by running independent promises in
+        parallel.
+        """
+
+        path = self.critical_path(root)
+        if not path:
+            return {}
+        work = sum([node.get('duration', 0.0) for node in self.__nodes
+                    if node['forced'] is not None])
+        length = sum([node.get('duration', 0.0) for node in path])
+        top = path[0]
+        return {'root': top['name'],
+                'latency': top['forced'] - top.get('entered', top['forced']),
+                'work': work,
+                'path': length,
+                'parallelism': length and work / length or 1.0,
+                'critical': [node['name'] for node in path]}
+
+    def wasted(self):
+        """
+        Return the nodes that were computed but never forced - the
+        result of this work was never used.
+        """
+
+        return [dict(node) for node in self.__nodes
+                if node['forced'] is None and 'finished' in node]
+
+    def to_json(self, path_or_file=None):
+        """
+        Return the graph as a JSON string with the nodes (including
+        their slack and wether they are on the critical path), the
+        edges and the summary. If path_or_file is given, write it
+        there, too.
+        """
+
+        critical = set([node['id'] for node in self.critical_path()])
+        slack = self.slack()
+        nodes = []
+        for node in self.nodes():
+            node['slack'] = slack.get(node['id'])
+            node['critical'] = node['id'] in critical
+            nodes.append(node)
+        data = json.dumps({'nodes': nodes,
+                           'edges': self.edges(),
+                           'summary': self.summary()}, indent=2)
+        _write(path_or_file, data)
+        return data
+
+    def to_dot(self, path_or_file=None):
+        """
+        Return the graph in the DOT language of graphviz. Nodes are
+        labeled with the function name and the compute time, the
+        critical path is drawn in red and wasted nodes are dashed.
+        If path_or_file is given, write it there, too.
+        """
+
+        critical = set([node['id'] for node in self.critical_path()])
+        slack = self.slack()
+        lines = ['digraph promises {', '    rankdir=LR;', '    node [shape=box];']
+        for node in self.__nodes:
+            label = '%s\\n%.3f ms' % (node['name'], node.get('duration', 0.0) * 1e3)
+            if node['id'] in slack:
+                label += '\\nslack %.3f ms' % (slack[node['id']] * 1e3)
+            attrs = ['label="%s"' % label.replace('"', '\\"')]
+            if node['id'] in critical:
+                attrs.append('color=red')
+            if node['forced'] is None:
+                attrs.append('style=dashed')
+            lines.append('    n%d [%s];' % (node['id'], ', '.join(attrs)))
+        for (parent, dep) in self.edges():
+            color = parent in critical and dep in critical and ' [color=red]' or ''
+            lines.append('    n%d -> n%d%s;' % (parent, dep, color))
+        lines.append('}')
+        data = '\n'.join(lines) + '\n'
+        _write(path_or_file, data)
+        return data
+
+class Audit(object):
+
+    """
+    This observer counts what happens to promises per class and
+    wrapped function: how many were created, how many are alive right
+    now, how many were forced, how many are alive but were never forced
+    and how many were dropped without ever being forced. The compute
+    time of futures whose result was dropped unread is counted as
+    wasted CPU time.
+
+    The computation of forked futures is only measured when they are
+    forced, so dropped forked futures count as dropped, but their CPU
+    time is unknown - they are killed when they are dropped, anyway.
+
+    The audit only costs something while it is started, so it can be
+    switched on for a while in a long running service and report()
+    can be exported periodically.
+    """
+
+    def __init__(self):
+        self.__lock = threading.RLock()
+        self.__live = {}
+        self.__counters = {}
+
+    def start(self):
+        if self not in observers:
+            observers.append(self)
+        return self
+
+    def stop(self):
+        if self in observers:
+            observers.remove(self)
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def __counter(self, key):
+        counter = self.__counters.get(key)
+        if counter is None:
+            counter = self.__counters[key] = {
+                'created': 0, 'forced': 0, 'dropped_unforced': 0,
+                'cpu': 0.0, 'wasted_cpu': 0.0}
+        return counter
+
+    def __dropped(self, key):
+        """
+        The weakref callback for promises that went away.
+        """
+
+        self.__lock.acquire()
+        try:
+            entry = self.__live.pop(key, None)
+            if entry is None:
+                return
+            (ref, counter, record) = entry
+            if not record['forced']:
+                counter['dropped_unforced'] += 1
+                counter['wasted_cpu'] += record['duration']
+        finally:
+            self.__lock.release()
+
+    def __call__(self, event, promise, func, info):
+        key = id(promise)
+        self.__lock.acquire()
+        try:
+            entry = self.__live.get(key)
+            if event == 'create' or entry is None:
+                counter = self.__counter((type(promise).__name__, _name(func)))
+                counter['created'] += 1
+                record = {'forced': False, 'duration': 0.0}
+                try:
+                    ref = weakref.ref(promise, lambda ref, key=key: self.__dropped(key))
+                except TypeError:
+                    ref = None
+                entry = self.__live[key] = (ref, counter, record)
+            (ref, counter, record) = entry
+            if event == 'finish':
+                record['duration'] += info['duration']
+                counter['cpu'] += info['duration']
+            elif event == 'force' and not record['forced']:
+                record['forced'] = True
+                counter['forced'] += 1
+            if ref is None and event == 'force':
+                # promises without weakref support are forgotten once
+                # forced, so their ids can't be mistaken for others
+                del self.__live[key]
+        finally:
+            self.__lock.release()
+
+    def report(self, reset=False):
+        """
+        Return a list of dictionaries, one per promise class and wrapped
+        function, with the counts 'created', 'live', 'forced',
+        'never_forced' (alive, but not forced yet) and
+        'dropped_unforced', the 'cpu' time of all computations, the
+        'wasted_cpu' of dropped unforced ones and the 'pending_cpu' of
+        live unforced ones. The list is sorted by wasted CPU time. With
+        reset, the counters of dropped promises start over.
+        """
+
+        self.__lock.acquire()
+        try:
+            live = {}
+            for (ref, counter, record) in self.__live.values():
+                stats = live.setdefault(id(counter), [0, 0, 0.0])
+                stats[0] += 1
+                if not record['forced']:
+                    stats[1] += 1
+                    stats[2] += record['duration']
+            result = []
+            for ((klass, name), counter) in self.__counters.items():
+                (alive, unforced, pending) = live.get(id(counter), [0, 0, 0.0])
+                entry = dict(counter)
+                entry.update({'class': klass, 'function': name, 'live': alive,
+                              'never_forced': unforced, 'pending_cpu': pending})
+                result.append(entry)
+            if reset:
+                for ((klass, name), counter) in list(self.__counters.items()):
+                    if id(counter) in live:
+                        counter.update({'created': 0, 'forced': 0, 'dropped_unforced': 0,
+                                        'cpu': 0.0, 'wasted_cpu': 0.0})
+                    else:
+                        del self.__counters[(klass, name)]
+        finally:
+            self.__lock.release()
+        result.sort(key=lambda entry: (-entry['wasted_cpu'], entry['class'], entry['function']))
+        return result
+
+    def totals(self):
+        """
+        Return the sums of all numbers in report().
+        """
+
+        totals = {}
+        for entry in self.report():
+            for (k, v) in entry.items():
+                if k not in ('class', 'function'):
+                    totals[k] = totals.get(k, 0) + v
+        return totals
+
+def _ready(node):
+    """
+    Return the time the value of a node was ready: when it's
+    computation finished or - if it wasn't computed in the
+    open - when it was forced.
+    """
+
+    if node['forced'] is None:
+        return None
+    return node.get('finished', node['forced'])
+
+def _write(path_or_file, data):
+    """
+    Write data to a file object or a file name, if there is one.
+    """
+
+    if path_or_file is None:
+        return
+    if hasattr(path_or_file, 'write'):
+        path_or_file.write(data)
+    else:
+        with open(path_or_file, 'w') as f:
+            f.write(data)
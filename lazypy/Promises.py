@@ -27,6 +27,7 @@ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 import functools
 import sys
+import time
 from lazypy.Utils import *
 
 __all__ = ["force",
@@ -45,6 +46,14 @@ def force(value):
     f = getattr(value, '__force__', None)
     return f() if f else value
 
+def _value(value):
+    """
+    This is what forced promises are unpickled with - they are just
+    replaced by their value.
+    """
+
+    return value
+
 class PromiseMetaClass(type):
 
     """
@@ -61,6 +70,11 @@ class PromiseMetaClass(type):
     
     The __magicfunctions__ list defines methods that should be mimicked by
     using some predefined function.
+
+    The __protocolfunctions__ are only built for promise classes that
+    name them in their __protocols__ attribute: a __fspath__ makes every
+    promise an os.PathLike and a __buffer__ makes it claim the buffer
+    protocol, no matter what the promised value is.
     
     The promise must define a __force__ method that will force evaluation
     of the promise.
@@ -93,6 +107,7 @@ class PromiseMetaClass(type):
                          ('__rne__', '__ne__'),
                          ('__rgt__', '__gt__'),
                          ('__rge__', '__ge__'),
+                         ('__rmatmul__', '__matmul__'),
                         ]
     
     __magicfunctions__ = [('__cmp__', cmp), 
@@ -117,8 +132,15 @@ class PromiseMetaClass(type):
                           ('__getslice__', getslice), 
                           ('__nonzero__', bool),
                           ('__bool__', bool),
+                          ('__index__', index),
+                          ('__contains__', contains),
+                          ('__array__', array),
                          ]
 
+    __protocolfunctions__ = {'path': ('__fspath__', fspath),
+                             'buffer': ('__buffer__', buffer),
+                            }
+
     def __init__(klass, name, bases, attributes):
         for k in klass.__magicmethods__:
             if k not in attributes:
@@ -131,6 +153,12 @@ class PromiseMetaClass(type):
         for (k, v) in klass.__magicfunctions__:
             if k not in attributes:
                 setattr(klass, k, klass.__forcedmethodfunc__(v))
+        for protocol in attributes.get('__protocols__', ()):
+            if protocol not in klass.__protocolfunctions__:
+                raise ValueError('unknown protocol %r' % protocol)
+            (k, v) = klass.__protocolfunctions__[protocol]
+            if k not in attributes:
+                setattr(klass, k, klass.__forcedmethodfunc__(v))
         super(PromiseMetaClass, klass).__init__(name, bases, attributes)
 
     def __forcedmethodname__(self, method):
@@ -230,6 +258,21 @@ class Promise(Promise):
         self.__args = args
         self.__kw = kw
         self.__result = NoneSoFar
+        if observers:
+            notify('create', self, func)
+
+    def __reduce__(self):
+        """
+        Pickle an unforced promise as the delayed call, so it is only
+        computed where it is unpickled. Arguments that are promises
+        are pickled the same way, and pickle writes promises that are
+        used more than once only once. Forced promises are pickled as
+        their value.
+        """
+
+        if self.__result is NoneSoFar:
+            return (self.__class__, (self.__func, tuple(self.__args), dict(self.__kw)))
+        return (_value, (self.__result,))
     
     def __force__(self):
         """
@@ -239,7 +282,41 @@ class Promise(Promise):
         """
 
         if self.__result is NoneSoFar:
+            if observers:
+                return self.__observed_force()
+            args = [force(arg) for arg in self.__args]
+            kw = dict([(k, force(v)) for (k, v) in self.__kw.items()])
+            self.__result = self.__func(*args, **kw)
+        return self.__result
+
+    def __observed_force(self):
+        """
+        This is __force__ with the events for the observers. It is
+        only used if there are observers, so normal forcing doesn't
+        pay for them. Every 'enter' gets it's 'finish' and 'force',
+        even if forcing an argument failed and the computation never
+        started.
+        """
+
+        entered = time.time()
+        notify('enter', self, self.__func, time=entered)
+        started = None
+        try:
             args = [force(arg) for arg in self.__args]
             kw = dict([(k, force(v)) for (k, v) in self.__kw.items()])
+            started = time.time()
+            notify('start', self, self.__func, time=started)
             self.__result = self.__func(*args, **kw)
+        except BaseException:
+            finished = time.time()
+            if started is None:
+                started = finished
+            notify('finish', self, self.__func, time=finished,
+                   duration=finished-started, error=True)
+            notify('force', self, self.__func, time=finished, blocked=finished-entered)
+            raise
+        finished = time.time()
+        notify('finish', self, self.__func, time=finished,
+               duration=finished-started, error=False)
+        notify('force', self, self.__func, time=finished, blocked=finished-entered)
         return self.__result
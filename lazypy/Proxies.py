@@ -0,0 +1,110 @@
+"""
+Lazy Evaluation for Python - main package with primary exports
+
+Copyright (c) 2004, Georg Bauer <gb@murphy.bofh.ms>, 
+Copyright (c) 2011, Alexander Marshalov <alone.amper@gmail.com>, 
+except where the file explicitly names other copyright holders and licenses.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of 
+this software and associated documentation files (the "Software"), to deal in 
+the Software without restriction, including without limitation the rights to 
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ 
+the Software, and to permit persons to whom the Software is furnished to do so, 
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all 
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ 
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR 
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER 
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN 
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from lazypy.Promises import PromiseMetaClass, force, _value
+from lazypy.Utils import NoneSoFar
+
+__all__ = ["LazyProxy",
+          ]
+
+# It's awful, but works in Python 2 and Python 3
+LazyProxy = PromiseMetaClass('LazyProxy', (object,), {'__slots__': ()})
+class LazyProxy(LazyProxy):
+
+    """
+    This is a promise that behaves as much as possible like the object
+    it stands for. Other than with Promise, attribute access, setting
+    and deleting attributes, dir(), with statements and isinstance()
+    all go to the forced value. So delay(ExpensiveClient, ...,
+    promiseclass=LazyProxy) can be handed to code that configures the
+    client - it is only built when it is first used.
+
+    The state of the proxy lives in slots, so it doesn't get in the way
+    of the attributes of the proxied object. type() still shows the
+    proxy class, of course - only isinstance() and __class__ see the
+    class of the forced value.
+    """
+
+    __slots__ = ('__func', '__args', '__kw', '__result', '__weakref__')
+
+    def __init__(self, func, args, kw):
+        """
+        Store the function and it's arguments for later. Since
+        setattr is forwarded, the slots have to be set directly.
+        """
+
+        object.__setattr__(self, '_LazyProxy__func', func)
+        object.__setattr__(self, '_LazyProxy__args', args)
+        object.__setattr__(self, '_LazyProxy__kw', kw)
+        object.__setattr__(self, '_LazyProxy__result', NoneSoFar)
+
+    def __force__(self):
+        """
+        This method forces the value to be computed and cached
+        for future use. All parameters to the call are forced,
+        too.
+        """
+
+        if self.__result is NoneSoFar:
+            args = [force(arg) for arg in self.__args]
+            kw = dict([(k, force(v)) for (k, v) in self.__kw.items()])
+            object.__setattr__(self, '_LazyProxy__result', self.__func(*args, **kw))
+        return self.__result
+
+    def __reduce__(self):
+        """
+        Pickle the proxy like a Promise - as the delayed call as long
+        as it is unforced and as the value afterwards.
+        """
+
+        if self.__result is NoneSoFar:
+            return (type(self), (self.__func, tuple(self.__args), dict(self.__kw)))
+        return (_value, (self.__result,))
+
+    def __getattr__(self, name):
+        if name.startswith('_LazyProxy__'):
+            raise AttributeError(name)
+        return getattr(force(self), name)
+
+    def __setattr__(self, name, value):
+        setattr(force(self), name, value)
+
+    def __delattr__(self, name):
+        delattr(force(self), name)
+
+    def __dir__(self):
+        return dir(force(self))
+
+    def __enter__(self):
+        return force(self).__enter__()
+
+    def __exit__(self, *args):
+        return force(self).__exit__(*args)
+
+    @property
+    def __class__(self):
+        return force(self).__class__
@@ -0,0 +1,245 @@
+"""
+Lazy Evaluation for Python - main package with primary exports
+
+Copyright (c) 2004, Georg Bauer <gb@murphy.bofh.ms>, 
+Copyright (c) 2011, Alexander Marshalov <alone.amper@gmail.com>, 
+except where the file explicitly names other copyright holders and licenses.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of 
+this software and associated documentation files (the "Software"), to deal in 
+the Software without restriction, including without limitation the rights to 
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ 
+the Software, and to permit persons to whom the Software is furnished to do so, 
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all 
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ 
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR 
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER 
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN 
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import threading
+import weakref
+from lazypy.Promises import Promise, PromiseMetaClass, force
+from lazypy.Utils import NoneSoFar
+
+__all__ = ["Cell",
+           "ReactivePromise",
+          ]
+
+# All reactive nodes share one lock and one revision counter. The
+# revision is bumped on every change of a cell, nodes remember at which
+# revision their value last changed and at which it was last verified.
+_lock = threading.RLock()
+_revision = [0]
+_local = threading.local()
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+def _track(node):
+    """
+    Record node as a dependency of the reactive promise that is being
+    computed right now in this thread, if there is one.
+    """
+
+    stack = _stack()
+    if stack:
+        stack[-1]._ReactivePromise__depend(node)
+
+def _invalidate(dependents):
+    """
+    Mark everything downstream of a changed node as stale. Nodes that
+    are stale already have marked their dependents, too.
+    """
+
+    todo = list(dependents)
+    while todo:
+        node = todo.pop()
+        if not node._ReactivePromise__stale:
+            node._ReactivePromise__stale = True
+            todo.extend(node._dependents().values())
+
+# It's awful, but works in Python 2 and Python 3
+Cell = PromiseMetaClass('Cell', (object,), {})
+class Cell(Cell):
+
+    """
+    A mutable input of a reactive graph. Forcing a cell gives it's
+    current value, set() changes it and marks all reactive promises
+    that used the cell as stale, so they are recomputed when they are
+    forced the next time. Setting a value equal to the current one
+    changes nothing.
+    """
+
+    __delayclass__ = Promise
+
+    def __init__(self, value=None):
+        self.__value = value
+        self.__changed = _revision[0]
+        self.__dependents = weakref.WeakValueDictionary()
+
+    def __force__(self):
+        _lock.acquire()
+        try:
+            _track(self)
+            return self.__value
+        finally:
+            _lock.release()
+
+    def get(self):
+        return self.__force__()
+
+    def set(self, value):
+        _lock.acquire()
+        try:
+            if value == self.__value:
+                return
+            self.__value = value
+            _revision[0] += 1
+            self.__changed = _revision[0]
+            _invalidate(self.__dependents.values())
+        finally:
+            _lock.release()
+
+    def _refresh(self):
+        return self.__changed
+
+    def _dependents(self):
+        return self.__dependents
+
+# It's awful, but works in Python 2 and Python 3
+ReactivePromise = PromiseMetaClass('ReactivePromise', (object,), {})
+class ReactivePromise(ReactivePromise):
+
+    """
+    A promise that is recomputed when it's inputs change. Every Cell and
+    ReactivePromise forced while it is computed - it's arguments and
+    anything it's function forces - is recorded as a dependency. When a
+    cell changes, the promises downstream of it are marked stale and
+    only those are recomputed on the next force, the rest of the graph
+    keeps it's cached results.
+
+    With early cutoff (on by default, set __cutoff__ to False in a
+    subclass to switch it off) a stale promise first brings it's
+    dependencies up to date and is only recomputed if one of them
+    really changed - if a recomputed value equals the old one, the
+    promises depending on it keep their results.
+
+    Plain promises in the middle of a reactive graph cache their value
+    forever, so use ReactivePromise for everything between the cells
+    and the values you look at.
+    """
+
+    __delayclass__ = Promise
+    __cutoff__ = True
+
+    def __init__(self, func, args, kw):
+        self.__func = func
+        self.__args = args
+        self.__kw = kw
+        self.__result = NoneSoFar
+        self.__stale = False
+        self.__invalid = False
+        self.__changed = 0
+        self.__verified = 0
+        self.__dependencies = {}
+        self.__dependents = weakref.WeakValueDictionary()
+        self.__computed = 0
+
+    def _dependents(self):
+        return self.__dependents
+
+    def __depend(self, node):
+        # promises compare and hash by their values, so the
+        # bookkeeping has to go by identity
+        if id(node) not in self.__dependencies:
+            self.__dependencies[id(node)] = node
+            node._dependents()[id(self)] = self
+
+    def __compute(self):
+        for node in self.__dependencies.values():
+            node._dependents().pop(id(self), None)
+        self.__dependencies = {}
+        stack = _stack()
+        stack.append(self)
+        try:
+            args = [force(arg) for arg in self.__args]
+            kw = dict([(k, force(v)) for (k, v) in self.__kw.items()])
+            result = self.__func(*args, **kw)
+        finally:
+            stack.pop()
+        self.__computed += 1
+        if not (self.__cutoff__ and self.__result is not NoneSoFar and result == self.__result):
+            self.__changed = _revision[0]
+        self.__result = result
+        self.__invalid = False
+
+    def _refresh(self):
+        """
+        Bring the value up to date and return the revision it last
+        changed at.
+        """
+
+        if self.__result is NoneSoFar or self.__invalid:
+            self.__compute()
+        elif self.__stale:
+            if not self.__cutoff__:
+                self.__compute()
+            else:
+                for node in list(self.__dependencies.values()):
+                    if node._refresh() > self.__verified:
+                        self.__compute()
+                        break
+        self.__stale = False
+        self.__verified = _revision[0]
+        return self.__changed
+
+    def __force__(self):
+        _lock.acquire()
+        try:
+            _track(self)
+            self._refresh()
+            return self.__result
+        finally:
+            _lock.release()
+
+    def invalidate(self):
+        """
+        Throw the cached value away, for example because the function
+        uses inputs that are no cells. It is recomputed on the next
+        force and the promises downstream are marked stale.
+        """
+
+        _lock.acquire()
+        try:
+            self.__invalid = True
+            _revision[0] += 1
+            _invalidate(self.__dependents.values())
+        finally:
+            _lock.release()
+
+    def stale(self):
+        """
+        Return True if the promise has to check it's inputs before it
+        gives out it's value.
+        """
+
+        return self.__result is NoneSoFar or self.__invalid or self.__stale
+
+    def computed(self):
+        """
+        Return how often the value was computed.
+        """
+
+        return self.__computed
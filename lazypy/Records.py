@@ -0,0 +1,271 @@
+"""
+Lazy Evaluation for Python - main package with primary exports
+
+Copyright (c) 2004, Georg Bauer <gb@murphy.bofh.ms>, 
+Copyright (c) 2011, Alexander Marshalov <alone.amper@gmail.com>, 
+except where the file explicitly names other copyright holders and licenses.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of 
+this software and associated documentation files (the "Software"), to deal in 
+the Software without restriction, including without limitation the rights to 
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ 
+the Software, and to permit persons to whom the Software is furnished to do so, 
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all 
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ 
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR 
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER 
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN 
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import mmap
+import os
+import struct
+import threading
+from array import array
+from lazypy.Promises import Promise
+
+__all__ = ["RecordFile",
+          ]
+
+try:
+    array('Q')
+    _typecode = 'Q'
+except ValueError:
+    _typecode = 'L'
+
+# the header of a persisted index: magic, size and mtime of the file,
+# number of offsets and length of the separator, followed by the
+# separator and the offsets
+_header = struct.Struct('<8sQQQQ')
+_magic = b'LAZYIDX1'
+
+def _stamp(path):
+    st = os.stat(path)
+    return (st.st_size, getattr(st, 'st_mtime_ns', int(st.st_mtime * 1e9)))
+
+class RecordFile(object):
+
+    """
+    A lazy source of the records of a (possibly huge) file. The file is
+    memory mapped and split at separator, but only as far as somebody
+    asks for records: the offsets of the records found so far are kept
+    in a compact array of integers, so the first records are there
+    long before the whole file is scanned, and no objects are built for
+    records nobody looks at.
+
+    Records are handed out as promises (of promiseclass) that decode the
+    bytes of just their record when they are forced - decode is called
+    with a memoryview of the record and returns bytes by default.
+    Iterating gives the promises in file order while the file is
+    scanned, len() and negative indices scan the whole file.
+
+    If index is the path of an index file, a valid one (for the same
+    file size and modification time) is loaded instead of scanning, and
+    a new one is written there as soon as the file was scanned
+    completely, so reopening the file later is instant.
+    """
+
+    def __init__(self, path, separator=b'\n', decode=bytes, index=None,
+                 promiseclass=Promise, chunksize=1 << 20):
+        if not separator:
+            raise ValueError('the separator must not be empty')
+        self.path = path
+        self.separator = separator
+        self.decode = decode
+        self.index = index
+        self.promiseclass = promiseclass
+        self.chunksize = chunksize
+        self.__lock = threading.Lock()
+        self.__file = open(path, 'rb')
+        self.__size = os.fstat(self.__file.fileno()).st_size
+        if self.__size:
+            self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.__map = b''
+        self.__offsets = array(_typecode)
+        self.__scanned = 0
+        self.__complete = False
+        if index is None or not self.__load(index):
+            if self.__size:
+                self.__offsets.append(0)
+            else:
+                self.__complete = True
+
+    def __load(self, path):
+        """
+        Load a persisted index. Returns False if there is none or it
+        doesn't match the file.
+        """
+
+        try:
+            f = open(path, 'rb')
+        except IOError:
+            return False
+        try:
+            header = f.read(_header.size)
+            if len(header) != _header.size:
+                return False
+            (magic, size, mtime, count, seplen) = _header.unpack(header)
+            if magic != _magic or (size, mtime) != _stamp(self.path) or \
+               f.read(seplen) != self.separator:
+                return False
+            offsets = array(_typecode)
+            try:
+                offsets.fromfile(f, count)
+            except EOFError:
+                return False
+        finally:
+            f.close()
+        self.__offsets = offsets
+        self.__scanned = self.__size
+        self.__complete = True
+        return True
+
+    def save_index(self, path=None):
+        """
+        Scan the whole file and write the index to path (the index
+        path given when opening the file by default).
+        """
+
+        path = path or self.index
+        if path is None:
+            raise ValueError('no index path')
+        self.__scan(None)
+        (size, mtime) = _stamp(self.path)
+        tmp = path + '.tmp'
+        f = open(tmp, 'wb')
+        try:
+            f.write(_header.pack(_magic, size, mtime, len(self.__offsets), len(self.separator)))
+            f.write(self.separator)
+            self.__offsets.tofile(f)
+        finally:
+            f.close()
+        os.rename(tmp, path)
+
+    def __scan(self, count):
+        """
+        Scan the file until the offsets of count + 1 records are known
+        (so the end of record count - 1 is known, too) or the end of
+        the file is reached. count None scans everything.
+        """
+
+        if self.__complete or (count is not None and len(self.__offsets) > count):
+            return
+        save = False
+        self.__lock.acquire()
+        try:
+            seplen = len(self.separator)
+            while not self.__complete and (count is None or len(self.__offsets) <= count):
+                end = min(self.__scanned + max(self.chunksize, 2 * seplen), self.__size)
+                pos = self.__scanned
+                while True:
+                    found = self.__map.find(self.separator, pos, end)
+                    if found < 0:
+                        break
+                    pos = found + seplen
+                    if pos < self.__size:
+                        self.__offsets.append(pos)
+                # a separator may cross the end of the chunk, so the
+                # next chunk starts right behind the last one found or
+                # a separator length before the end of this one
+                self.__scanned = max(pos, end - seplen + 1) if end < self.__size else end
+                if self.__scanned >= self.__size:
+                    self.__complete = True
+                    save = self.index is not None
+        finally:
+            self.__lock.release()
+        if save:
+            self.save_index()
+
+    def scanned(self):
+        """
+        Return the number of bytes scanned so far.
+        """
+
+        return self.__scanned
+
+    def complete(self):
+        """
+        Return True if the whole file has been scanned.
+        """
+
+        return self.__complete
+
+    def __bounds(self, index):
+        if index < 0:
+            self.__scan(None)
+            index += len(self.__offsets)
+            if index < 0:
+                raise IndexError('record index out of range')
+        else:
+            self.__scan(index + 1)
+        offsets = self.__offsets
+        if index >= len(offsets):
+            raise IndexError('record index out of range')
+        start = offsets[index]
+        if index + 1 < len(offsets):
+            end = offsets[index + 1] - len(self.separator)
+        else:
+            end = self.__size
+            if self.__map[end - len(self.separator):end] == self.separator:
+                end -= len(self.separator)
+        return (start, end)
+
+    def raw(self, index):
+        """
+        Return a memoryview of the bytes of a record, without the
+        separator. Nothing is copied, so the file can't be closed
+        while the view is still in use.
+        """
+
+        (start, end) = self.__bounds(index)
+        return memoryview(self.__map)[start:end]
+
+    def load(self, index):
+        """
+        Decode a record right away.
+        """
+
+        return self.decode(self.raw(index))
+
+    def __getitem__(self, index):
+        """
+        Return a promise for a record. The file is only scanned and
+        the record decoded when the promise is forced.
+        """
+
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.promiseclass(self.load, (index,), {})
+
+    def __iter__(self):
+        index = 0
+        while True:
+            self.__scan(index + 1)
+            if index >= len(self.__offsets):
+                return
+            yield self.promiseclass(self.load, (index,), {})
+            index += 1
+
+    def __len__(self):
+        self.__scan(None)
+        return len(self.__offsets)
+
+    def close(self):
+        if self.__size:
+            self.__map.close()
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
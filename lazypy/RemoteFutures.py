@@ -0,0 +1,344 @@
+"""
+Lazy Evaluation for Python - main package with primary exports
+
+Copyright (c) 2004, Georg Bauer <gb@murphy.bofh.ms>, 
+Copyright (c) 2011, Alexander Marshalov <alone.amper@gmail.com>, 
+except where the file explicitly names other copyright holders and licenses.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of 
+this software and associated documentation files (the "Software"), to deal in 
+the Software without restriction, including without limitation the rights to 
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ 
+the Software, and to permit persons to whom the Software is furnished to do so, 
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all 
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ 
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR 
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER 
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN 
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import pickle
+import threading
+import types
+from multiprocessing import Process, current_process
+from multiprocessing.connection import Listener, Client, arbitrary_address
+from multiprocessing.util import Finalize
+from lazypy.Promises import Promise, PromiseMetaClass
+from lazypy.Futures import BrokenFutureError
+from lazypy.Utils import NoneSoFar
+from lazypy.Serialization import dumps
+
+__all__ = ["RemoteFuture",
+           "WorkerPool",
+           "serve",
+           "start_workers",
+           "set_workers",
+          ]
+
+def serve(address, authkey=None, batchsize=64):
+    """
+    This is the main loop of a worker daemon. It listens on address
+    (a (host, port) tuple for TCP or a path for a unix socket) and
+    runs every thunk sent to it, each connection in it's own thread.
+    A connection can be used for any number of thunks, one after the
+    other. Results that are generators are sent back in batches of
+    batchsize items while they are produced.
+
+    Thunks are pickled, so only run workers for clients you trust -
+    the authkey (the one of the current process by default) keeps
+    everybody else out. Since the threads of one daemon share the
+    GIL, run one daemon per core for CPU bound work.
+    """
+
+    if authkey is None:
+        authkey = current_process().authkey
+    _serve(Listener(address, authkey=authkey), batchsize)
+
+def _serve(listener, batchsize):
+    """
+    Accept connections on a bound listener and handle each one in a
+    thread of it's own.
+    """
+
+    try:
+        while True:
+            conn = listener.accept()
+            thread = threading.Thread(target=_handle, args=(conn, batchsize))
+            thread.daemon = True
+            thread.start()
+    finally:
+        listener.close()
+
+class _EndOfStream(object):
+    """
+    This is the marker a worker sends as the value of a result
+    after the last batch of a streamed generator.
+    """
+    pass
+
+def _handle(conn, batchsize):
+    """
+    Run thunks from one client connection until the client goes
+    away. A normal result is sent as ('result', flag, value). A
+    generator is sent as a number of ('items', batch) messages,
+    followed by a result that is either _EndOfStream or the
+    exception raised by the generator.
+    """
+
+    try:
+        while True:
+            data = conn.recv_bytes()
+            try:
+                (func, args, kw) = pickle.loads(data)
+                res = func(*args, **kw)
+                if isinstance(res, types.GeneratorType):
+                    batch = []
+                    for item in res:
+                        batch.append(item)
+                        if len(batch) >= batchsize:
+                            conn.send(('items', batch))
+                            batch = []
+                    if batch:
+                        conn.send(('items', batch))
+                    res = _EndOfStream
+                res = ('result', True, res)
+            except (EOFError, IOError, OSError):
+                raise
+            except Exception as e:
+                res = ('result', False, e)
+            try:
+                conn.send(res)
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                conn.send(('result', False, e))
+    except (EOFError, IOError, OSError):
+        pass
+    finally:
+        conn.close()
+
+_workers = []
+
+def start_workers(count, authkey=None, batchsize=64, family='AF_UNIX'):
+    """
+    Start count worker daemons on the local machine, listening on
+    unix sockets (or on TCP ports of localhost if family is
+    'AF_INET'), and return the list of their addresses. The sockets
+    are bound before the daemons start, so they accept connections
+    right away. The daemons are killed when the current process exits.
+    """
+
+    if authkey is None:
+        authkey = current_process().authkey
+    addresses = []
+    for n in range(count):
+        listener = Listener(arbitrary_address(family), authkey=authkey)
+        proc = Process(target=_serve, args=(listener, batchsize))
+        proc.daemon = True
+        proc.start()
+        _workers.append((proc, listener))
+        addresses.append(listener.address)
+    return addresses
+
+class WorkerPool(object):
+
+    """
+    A pool of connections to a number of worker daemons. Thunks are
+    spread round robin over the workers. A connection is used by
+    one future at a time and goes back into the pool when the result
+    has been received, so the number of connections only grows up to
+    the number of concurrently pending futures.
+    """
+
+    def __init__(self, addresses, authkey=None):
+        if not addresses:
+            raise ValueError('a worker pool needs at least one worker')
+        if authkey is None:
+            authkey = current_process().authkey
+        self.addresses = list(addresses)
+        self.authkey = authkey
+        self.__idle = dict([(address, []) for address in self.addresses])
+        self.__next = 0
+        self.__lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Return an (address, connection) pair for the next worker,
+        reusing an idle connection if there is one.
+        """
+
+        self.__lock.acquire()
+        try:
+            address = self.addresses[self.__next % len(self.addresses)]
+            self.__next += 1
+            idle = self.__idle[address]
+            conn = idle and idle.pop() or None
+        finally:
+            self.__lock.release()
+        if conn is None:
+            conn = Client(address, authkey=self.authkey)
+        return (address, conn)
+
+    def release(self, address, conn):
+        """
+        Put a connection back into the pool.
+        """
+
+        self.__lock.acquire()
+        try:
+            self.__idle[address].append(conn)
+        finally:
+            self.__lock.release()
+
+    def idle(self):
+        """
+        Return the number of idle connections in the pool.
+        """
+
+        return sum([len(conns) for conns in self.__idle.values()])
+
+    def close(self):
+        """
+        Close all idle connections.
+        """
+
+        self.__lock.acquire()
+        try:
+            for conns in self.__idle.values():
+                while conns:
+                    conns.pop().close()
+        finally:
+            self.__lock.release()
+
+_pool = None
+
+def set_workers(addresses, authkey=None):
+    """
+    Set the default worker pool used by RemoteFuture. Returns the
+    new pool.
+    """
+
+    global _pool
+    if _pool is not None:
+        _pool.close()
+    _pool = WorkerPool(addresses, authkey)
+    return _pool
+
+def _close(conn):
+    """
+    Close the connection of a future that was dropped with it's
+    result still pending - it can't be reused for other thunks.
+    """
+
+    conn.close()
+
+# It's awful, but works in Python 2 and Python 3
+RemoteFuture = PromiseMetaClass('RemoteFuture', (object,), {})
+class RemoteFuture(RemoteFuture):
+
+    """
+    This class builds futures that are computed by worker daemons,
+    possibly on other machines. The thunk is pickled (with cloudpickle
+    if it is installed, so lambdas and closures work, too) and sent to
+    the next worker of the pool. The pool is the one set with
+    set_workers, unless a subclass defines __pool__.
+
+    If the function returns a generator, forcing the future gives an
+    iterator over the items the worker streams back in batches. Since
+    the items come from a generator, they can only be consumed once,
+    like with ForkedStream.
+
+    Workers and clients have to agree on the pickled code - the
+    functions need to be importable on the workers or the thunks
+    have to be sent with cloudpickle.
+    """
+
+    __delayclass__ = Promise
+    __pool__ = None
+
+    def __init__(self, func, args, kw):
+        """
+        Send the thunk to a worker. The connection is kept by the
+        future until the result has been received.
+        """
+
+        pool = self.__pool__ or _pool
+        if pool is None:
+            raise BrokenFutureError('no workers, use set_workers first')
+        (address, conn) = pool.acquire()
+        conn.send_bytes(dumps((func, list(args), dict(kw))))
+        self.__pool = pool
+        self.__address = address
+        self.__conn = conn
+        self.__result = NoneSoFar
+        self.__exception = NoneSoFar
+        self.__closer = Finalize(self, _close, (conn,))
+
+    def __done(self):
+        """
+        The result is complete, so the connection can be reused.
+        """
+
+        self.__closer.cancel()
+        self.__pool.release(self.__address, self.__conn)
+
+    def __receive(self):
+        """
+        Receive one message from the worker. If the connection breaks,
+        the future is broken.
+        """
+
+        try:
+            return self.__conn.recv()
+        except (EOFError, IOError, OSError):
+            self.__closer()
+            raise BrokenFutureError
+
+    def __iterate(self, batch):
+        """
+        This generator yields the items of a streamed result, starting
+        with the first batch that was already received.
+        """
+
+        while True:
+            for item in batch:
+                yield item
+            msg = self.__receive()
+            if msg[0] == 'items':
+                batch = msg[1]
+            else:
+                self.__done()
+                if not msg[1]:
+                    raise msg[2]
+                return
+
+    def __force__(self):
+        """
+        This function returns either the value or the exception
+        of the future. If the worker isn't done yet, this call will
+        block until it is. For streamed results it returns as soon
+        as the first batch (or the end of the stream) arrives.
+        """
+
+        if self.__result is NoneSoFar and self.__exception is NoneSoFar:
+            msg = self.__receive()
+            if msg[0] == 'items':
+                self.__result = self.__iterate(msg[1])
+            else:
+                self.__done()
+                if not msg[1]:
+                    self.__exception = msg[2]
+                elif msg[2] is _EndOfStream:
+                    self.__result = iter([])
+                else:
+                    self.__result = msg[2]
+        if self.__result is not NoneSoFar:
+            return self.__result
+        elif self.__exception is not NoneSoFar:
+            raise self.__exception
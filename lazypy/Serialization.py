@@ -0,0 +1,94 @@
+"""
+Lazy Evaluation for Python - main package with primary exports
+
+Copyright (c) 2004, Georg Bauer <gb@murphy.bofh.ms>, 
+Copyright (c) 2011, Alexander Marshalov <alone.amper@gmail.com>, 
+except where the file explicitly names other copyright holders and licenses.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of 
+this software and associated documentation files (the "Software"), to deal in 
+the Software without restriction, including without limitation the rights to 
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ 
+the Software, and to permit persons to whom the Software is furnished to do so, 
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all 
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ 
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR 
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER 
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN 
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import io
+import pickle
+from lazypy.Promises import PromiseMetaClass
+
+try:
+    import cloudpickle
+
+    class _Pickler(cloudpickle.Pickler):
+
+        """
+        cloudpickle looks at the __class__ of objects before it asks
+        them how to reduce themselves, which would force a LazyProxy.
+        Promises are reduced with their own __reduce__ right away.
+        """
+
+        def reducer_override(self, obj):
+            if isinstance(type(obj), PromiseMetaClass):
+                return obj.__reduce__()
+            return super(_Pickler, self).reducer_override(obj)
+
+except ImportError:
+    _Pickler = pickle.Pickler
+
+__all__ = ["dumps",
+           "loads",
+           "dump",
+           "load",
+          ]
+
+def dumps(obj, protocol=pickle.HIGHEST_PROTOCOL):
+    """
+    Serialize obj - usually a graph of unforced promises - without
+    forcing anything. Unforced promises are written as their delayed
+    calls, forced ones as their value, and a promise that is used in
+    several places of the graph is written only once, so it is still
+    shared (and computed only once) after loading. Futures are already
+    running somewhere, so they are written as their value.
+
+    cloudpickle is used if it is installed, so promises of lambdas and
+    closures can be serialized, too.
+    """
+
+    buf = io.BytesIO()
+    dump(obj, buf, protocol)
+    return buf.getvalue()
+
+def loads(data):
+    """
+    Load a promise graph written by dumps. Nothing is computed until
+    the promises are forced.
+    """
+
+    return pickle.loads(data)
+
+def dump(obj, file, protocol=pickle.HIGHEST_PROTOCOL):
+    """
+    Write a promise graph to an open binary file.
+    """
+
+    _Pickler(file, protocol).dump(obj)
+
+def load(file):
+    """
+    Read a promise graph from an open binary file.
+    """
+
+    return pickle.load(file)
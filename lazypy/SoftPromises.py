@@ -0,0 +1,239 @@
+"""
+Lazy Evaluation for Python - main package with primary exports
+
+Copyright (c) 2004, Georg Bauer <gb@murphy.bofh.ms>, 
+Copyright (c) 2011, Alexander Marshalov <alone.amper@gmail.com>, 
+except where the file explicitly names other copyright holders and licenses.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of 
+this software and associated documentation files (the "Software"), to deal in 
+the Software without restriction, including without limitation the rights to 
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ 
+the Software, and to permit persons to whom the Software is furnished to do so, 
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all 
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ 
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR 
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER 
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN 
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import itertools
+import sys
+import threading
+from collections import OrderedDict
+from lazypy.Promises import Promise, PromiseMetaClass, force
+from lazypy.Utils import NoneSoFar
+
+__all__ = ["SoftPromise",
+           "ResultPool",
+           "set_budget",
+          ]
+
+def sizeof(value):
+    """
+    Estimate the memory used by a value: the value itself and, for
+    the builtin containers, the items it directly contains. Objects
+    with an nbytes attribute (numpy arrays, memoryviews) report their
+    buffer size.
+    """
+
+    size = getattr(value, 'nbytes', None)
+    if isinstance(size, int):
+        return size + sys.getsizeof(value, 0)
+    size = sys.getsizeof(value, 0)
+    if isinstance(value, dict):
+        for (k, v) in value.items():
+            size += sys.getsizeof(k, 0) + sys.getsizeof(v, 0)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += sys.getsizeof(item, 0)
+    return size
+
+class ResultPool(object):
+
+    """
+    A pool of forced results with a memory budget in bytes. When the
+    results take more than budget bytes, the least recently used ones
+    are evicted. Results bigger than the whole budget are not kept at
+    all. Sizes are estimated with the sizeof function given.
+    """
+
+    def __init__(self, budget, sizeof=sizeof):
+        self.budget = budget
+        self.sizeof = sizeof
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__lock = threading.Lock()
+        self.__results = OrderedDict()
+
+    def get(self, token):
+        """
+        Return the result stored under token (and mark it as recently
+        used) or NoneSoFar if there is none.
+        """
+
+        self.__lock.acquire()
+        try:
+            entry = self.__results.pop(token, None)
+            if entry is None:
+                self.misses += 1
+                return NoneSoFar
+            self.__results[token] = entry
+            self.hits += 1
+            return entry[0]
+        finally:
+            self.__lock.release()
+
+    def put(self, token, value):
+        """
+        Store a result and evict old ones until the pool fits it's
+        budget again.
+        """
+
+        size = self.sizeof(value)
+        self.__lock.acquire()
+        try:
+            self.__discard(token)
+            if size > self.budget:
+                return
+            self.__results[token] = (value, size)
+            self.size += size
+            self.__evict()
+        finally:
+            self.__lock.release()
+
+    def __evict(self):
+        while self.size > self.budget:
+            (token, (value, size)) = self.__results.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+
+    def resize(self, budget):
+        """
+        Change the budget, evicting results if it shrinks.
+        """
+
+        self.__lock.acquire()
+        try:
+            self.budget = budget
+            self.__evict()
+        finally:
+            self.__lock.release()
+
+    def __discard(self, token):
+        entry = self.__results.pop(token, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def discard(self, token):
+        """
+        Forget the result stored under token.
+        """
+
+        self.__lock.acquire()
+        try:
+            self.__discard(token)
+        finally:
+            self.__lock.release()
+
+    def clear(self):
+        self.__lock.acquire()
+        try:
+            self.__results.clear()
+            self.size = 0
+        finally:
+            self.__lock.release()
+
+    def __len__(self):
+        return len(self.__results)
+
+    def stats(self):
+        """
+        Return a dictionary with the number of results, their size,
+        the budget and the hit, miss and eviction counts.
+        """
+
+        return {'results': len(self.__results), 'size': self.size,
+                'budget': self.budget, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+results = ResultPool(256 << 20)
+
+def set_budget(budget):
+    """
+    Change the budget of the global result pool, evicting results
+    if it shrinks.
+    """
+
+    results.resize(budget)
+
+_tokens = itertools.count()
+
+# It's awful, but works in Python 2 and Python 3
+SoftPromise = PromiseMetaClass('SoftPromise', (object,), {})
+class SoftPromise(SoftPromise):
+
+    """
+    A promise that doesn't hold on to it's result. Forced results go
+    into a result pool with a memory budget - the global one of this
+    module or the __pool__ of a subclass - and if the pool evicts a
+    result to stay within it's budget, the next access just computes
+    it again. So this trades CPU for memory and only works for
+    functions that give the same result every time.
+
+    The function and the arguments are kept to be able to recompute
+    the value, so arguments that are big themselves should be soft
+    promises, too.
+    """
+
+    __delayclass__ = Promise
+    __pool__ = None
+
+    def __init__(self, func, args, kw):
+        self.__func = func
+        self.__args = args
+        self.__kw = kw
+        self.__token = next(_tokens)
+        self.__computed = 0
+
+    def __pool(self):
+        if self.__pool__ is None:
+            return results
+        return self.__pool__
+
+    def computed(self):
+        """
+        Return how often the value was computed.
+        """
+
+        return self.__computed
+
+    def __force__(self):
+        pool = self.__pool()
+        result = pool.get(self.__token)
+        if result is NoneSoFar:
+            args = [force(arg) for arg in self.__args]
+            kw = dict([(k, force(v)) for (k, v) in self.__kw.items()])
+            result = self.__func(*args, **kw)
+            self.__computed += 1
+            pool.put(self.__token, result)
+        return result
+
+    def __reduce__(self):
+        return (self.__class__, (self.__func, tuple(self.__args), dict(self.__kw)))
+
+    def __del__(self):
+        try:
+            self.__pool().discard(self.__token)
+        except Exception:
+            pass
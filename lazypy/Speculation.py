@@ -0,0 +1,222 @@
+"""
+Lazy Evaluation for Python - main package with primary exports
+
+Copyright (c) 2004, Georg Bauer <gb@murphy.bofh.ms>, 
+Copyright (c) 2011, Alexander Marshalov <alone.amper@gmail.com>, 
+except where the file explicitly names other copyright holders and licenses.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of 
+this software and associated documentation files (the "Software"), to deal in 
+the Software without restriction, including without limitation the rights to 
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ 
+the Software, and to permit persons to whom the Software is furnished to do so, 
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all 
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ 
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR 
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER 
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN 
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import itertools
+import os
+import threading
+import weakref
+from lazypy.Promises import Promise, PromiseMetaClass, force
+from lazypy.Utils import NoneSoFar
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+__all__ = ["SpeculativePromise",
+          ]
+
+_queues = {}
+_lock = threading.Lock()
+_order = itertools.count()
+
+def _lower_priority():
+    """
+    Make the current thread run at the lowest CPU priority, where the
+    platform allows that for single threads (Linux does). Elsewhere
+    speculative threads just compete with the others.
+    """
+
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+
+def _speculate(tasks):
+    """
+    The main loop of a speculative worker thread. Tasks are weak
+    references to promises, so promises that were dropped are
+    skipped here.
+    """
+
+    _lower_priority()
+    while True:
+        (priority, order, ref) = tasks.get()
+        promise = ref()
+        if promise is not None:
+            promise._SpeculativePromise__speculate()
+        del promise
+
+def _queue(size):
+    """
+    Return the task queue of the shared speculative workers of the
+    given size, starting the daemon threads on first use.
+    """
+
+    _lock.acquire()
+    try:
+        tasks = _queues.get(size)
+        if tasks is None:
+            tasks = _queues[size] = queue.PriorityQueue()
+            for n in range(size):
+                thread = threading.Thread(target=_speculate, args=(tasks,))
+                thread.daemon = True
+                thread.start()
+        return tasks
+    finally:
+        _lock.release()
+
+def _forget():
+    """
+    The worker threads are gone in a forked child, so it has to
+    start it's own ones.
+    """
+
+    _queues.clear()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget)
+
+# It's awful, but works in Python 2 and Python 3
+SpeculativePromise = PromiseMetaClass('SpeculativePromise', (object,), {})
+class SpeculativePromise(SpeculativePromise):
+
+    """
+    A speculative promise is a promise that idle worker threads may
+    compute before anybody asks for it. The thunk is queued at low
+    priority with the shared speculative workers - __speculators__ of
+    them, at the lowest thread priority the platform allows - and if
+    one of them gets to it first, forcing the promise just returns the
+    result. If the promise is forced while it's task is still queued,
+    it is computed inline and the task is cancelled. If a worker is
+    already running it, forcing waits for the worker.
+
+    The queue only keeps weak references, so promises that are dropped
+    unforced don't keep their thunk alive and their task is skipped.
+    Tasks with a lower __priority__ run first, tasks of the same
+    priority in the order they were queued.
+
+    Exceptions in speculative runs are thrown away, the promise is just
+    computed again when it is forced, like a normal promise. Since the
+    workers are threads, speculation helps with code that waits or
+    releases the GIL - use it for pure functions only, since the work
+    may run even if the value is never needed.
+    """
+
+    __delayclass__ = Promise
+    __speculators__ = 2
+    __priority__ = 0
+
+    def __init__(self, func, args, kw):
+        """
+        Store the thunk and queue it for speculative evaluation.
+        """
+
+        self.__func = func
+        self.__args = args
+        self.__kw = kw
+        self.__result = NoneSoFar
+        self.__state = 'queued'
+        self.__sync = threading.Condition()
+        _queue(self.__speculators__).put((self.__priority__, next(_order), weakref.ref(self)))
+
+    def __claim(self, state):
+        """
+        Take over a queued promise. Returns False if somebody else has
+        it already.
+        """
+
+        self.__sync.acquire()
+        try:
+            if self.__state != 'queued':
+                return False
+            self.__state = state
+            return True
+        finally:
+            self.__sync.release()
+
+    def __compute(self):
+        args = [force(arg) for arg in self.__args]
+        kw = dict([(k, force(v)) for (k, v) in self.__kw.items()])
+        return self.__func(*args, **kw)
+
+    def __speculate(self):
+        """
+        Run the thunk in a speculative worker, unless it was forced or
+        cancelled in the meantime.
+        """
+
+        if not self.__claim('running'):
+            return
+        try:
+            result = self.__compute()
+            state = 'done'
+        except Exception:
+            result = NoneSoFar
+            state = 'inline'
+        self.__sync.acquire()
+        try:
+            self.__result = result
+            self.__state = state
+            self.__sync.notify_all()
+        finally:
+            self.__sync.release()
+        if state == 'done':
+            self.__func = self.__args = self.__kw = None
+
+    def cancel(self):
+        """
+        Take the promise out of the speculative queue. It will be
+        computed when forced. Returns False if a worker had started
+        with it already.
+        """
+
+        return self.__claim('inline')
+
+    def speculated(self):
+        """
+        Return True if a worker has computed the result.
+        """
+
+        return self.__state == 'done'
+
+    def __force__(self):
+        """
+        Return the result of a worker or compute it inline.
+        """
+
+        if self.__result is NoneSoFar:
+            self.__claim('inline')
+            self.__sync.acquire()
+            try:
+                while self.__state == 'running':
+                    self.__sync.wait()
+            finally:
+                self.__sync.release()
+            if self.__result is NoneSoFar:
+                self.__result = self.__compute()
+        return self.__result
@@ -25,7 +25,9 @@ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
+import os
 import sys
+import time
 import operator
 
 __all__ = ["NoneSoFar",
@@ -40,6 +42,13 @@ __all__ = ["NoneSoFar",
            "cmp",
            "long",
            "PY_VER",
+           "observers",
+           "notify",
+           "index",
+           "contains",
+           "fspath",
+           "array",
+           "buffer",
           ]
 
 class NoneSoFar(object):
@@ -60,7 +69,64 @@ class NoneSoFar(object):
 NoneSoFar = NoneSoFar()
 PY_VER = sys.version_info[0]
 
+# Observers are called with (event, promise, func, info) for the life
+# cycle events of promises and futures. As long as there are none, the
+# promise classes skip all bookkeeping for them.
+observers = []
+
+def notify(event, promise, func, **info):
+    """
+    Tell all observers about an event of a promise. The events are
+    'create', 'enter' (a force call started that has to wait for the
+    value), 'start' and 'finish' (the computation itself, 'finish'
+    has the duration and the error flag) and 'force' (the first force
+    call got the value, with the time it blocked). Each event has
+    the time it happened, unless the caller passes one.
+    """
+
+    if 'time' not in info:
+        info['time'] = time.time()
+    for observer in list(observers):
+        observer(event, promise, func, info)
+
 getitem,setitem,delitem  = operator.getitem,operator.setitem,operator.delitem
+index,contains = operator.index,operator.contains
+
+def fspath(path):
+    """
+    This is a helper function needed in promise objects to pass on
+    __fspath__ calls, so promises of paths can be opened. It's
+    os.fspath where that exists.
+    """
+
+    if hasattr(os, 'fspath'):
+        return os.fspath(path)
+    return path
+
+def array(value, dtype=None, copy=None):
+    """
+    This is a helper function needed in promise objects to pass on
+    __array__ calls from numpy. Arrays are handed out as they are
+    (unless a copy or another dtype is asked for), so numpy.asarray
+    on a promise of an array doesn't copy it. It's only ever called
+    by numpy, so numpy is only imported here.
+    """
+
+    import numpy
+    if copy:
+        return numpy.array(value, dtype=dtype, copy=True)
+    return numpy.asarray(value, dtype=dtype)
+
+def buffer(value, flags):
+    """
+    This is a helper function needed in promise objects to pass on
+    __buffer__ calls (Python 3.12 and later), so memoryview() on a
+    promise of bytes or an array shares the memory of the value.
+    """
+
+    if hasattr(value, '__buffer__'):
+        return value.__buffer__(flags)
+    return memoryview(value)
 
 if PY_VER >= 3:
 
@@ -26,6 +26,7 @@ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
 import sys
+import warnings
 assert sys.hexversion >= 0x02070000, 'at least Python 2.7 is needed'
 
 __version__ = "0.6"
@@ -34,18 +35,117 @@ __all__ = ["Promise",
            "force",
            "Future",
            "ForkedFuture",
+           "ForkedStream",
+           "ForkedDataflowFuture",
+           "RemoteFuture",
            "LazyEvaluated",
            "LazyEvaluatedMetaClass",
+           "lazyattribute",
+           "memoized",
+           "reset",
            "delay",
            "lazy",
            "spawn",
            "future",
            "fork",
            "forked",
+           "lazy_import",
+           "LazyProxy",
+           "PoolFuture",
+           "ForkedPoolFuture",
+           "background",
+           "FutureEvaluated",
+           "FutureEvaluatedMetaClass",
+           "ForkEvaluated",
+           "ForkEvaluatedMetaClass",
+           "Profiler",
+           "CriticalPath",
+           "SpeculativePromise",
+           "Adaptive",
+           "LazyDict",
+           "LazyList",
+           "SoftPromise",
+           "ResultPool",
+           "Cell",
+           "ReactivePromise",
+           "InterpreterFuture",
+           "Audit",
+           "AsyncFuture",
+           "RecordFile",
           ]
 
-from lazypy.Promises import Promise, PromiseMetaClass, force
-from lazypy.Futures import Future
-from lazypy.ForkedFutures import ForkedFuture
-from lazypy.LazyClasses import LazyEvaluated, LazyEvaluatedMetaClass
-from lazypy.Functions import delay, lazy, spawn, future, fork, forked
+# submodules are only imported when one of their exports is used
+# first, so "import lazypy" doesn't pull in multiprocessing or socket
+__exports__ = {"Promise": "lazypy.Promises",
+               "PromiseMetaClass": "lazypy.Promises",
+               "force": "lazypy.Promises",
+               "Future": "lazypy.Futures",
+               "ForkedFuture": "lazypy.ForkedFutures",
+               "ForkedStream": "lazypy.ForkedFutures",
+               "ForkedDataflowFuture": "lazypy.ForkedFutures",
+               "RemoteFuture": "lazypy.RemoteFutures",
+               "LazyEvaluated": "lazypy.LazyClasses",
+               "LazyEvaluatedMetaClass": "lazypy.LazyClasses",
+               "lazyattribute": "lazypy.LazyClasses",
+               "memoized": "lazypy.LazyClasses",
+               "reset": "lazypy.LazyClasses",
+               "delay": "lazypy.Functions",
+               "lazy": "lazypy.Functions",
+               "spawn": "lazypy.Functions",
+               "future": "lazypy.Functions",
+               "fork": "lazypy.Functions",
+               "forked": "lazypy.Functions",
+               "lazy_import": "lazypy.LazyImports",
+               "LazyProxy": "lazypy.Proxies",
+               "PoolFuture": "lazypy.PoolFutures",
+               "ForkedPoolFuture": "lazypy.PoolFutures",
+               "background": "lazypy.LazyClasses",
+               "FutureEvaluated": "lazypy.LazyClasses",
+               "FutureEvaluatedMetaClass": "lazypy.LazyClasses",
+               "ForkEvaluated": "lazypy.LazyClasses",
+               "ForkEvaluatedMetaClass": "lazypy.LazyClasses",
+               "Profiler": "lazypy.Profiling",
+               "CriticalPath": "lazypy.Profiling",
+               "SpeculativePromise": "lazypy.Speculation",
+               "Adaptive": "lazypy.Adaptive",
+               "LazyDict": "lazypy.LazyCollections",
+               "LazyList": "lazypy.LazyCollections",
+               "SoftPromise": "lazypy.SoftPromises",
+               "ResultPool": "lazypy.SoftPromises",
+               "Cell": "lazypy.Reactive",
+               "ReactivePromise": "lazypy.Reactive",
+               "InterpreterFuture": "lazypy.InterpreterFutures",
+               "Audit": "lazypy.Profiling",
+               "AsyncFuture": "lazypy.AsyncFutures",
+               "RecordFile": "lazypy.Records",
+              }
+
+if sys.version_info >= (3, 7):
+
+    def __getattr__(name):
+        module = __exports__.get(name)
+        if module is None:
+            raise AttributeError("module 'lazypy' has no attribute %r" % name)
+        value = getattr(__import__(module, fromlist=[name]), name)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(__exports__))
+
+else:
+
+    # modules that need newer Pythons than the package itself
+    __optional__ = ("lazypy.InterpreterFutures",
+                    "lazypy.AsyncFutures",
+                   )
+
+    for (name, module) in __exports__.items():
+        try:
+            globals()[name] = getattr(__import__(module, fromlist=[name]), name)
+        except (ImportError, SyntaxError):
+            if module not in __optional__:
+                raise
+            warnings.warn("%s is not available: %s can't be imported"
+                          % (name, module), RuntimeWarning)
+            __all__.remove(name)
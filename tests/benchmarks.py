@@ -0,0 +1,350 @@
+"""
+Lazy Evaluation for Python - main package with primary exports
+
+Copyright (c) 2004, Georg Bauer <gb@murphy.bofh.ms>, 
+Copyright (c) 2011, Alexander Marshalov <alone.amper@gmail.com>, 
+except where the file explicitly names other copyright holders and licenses.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of 
+this software and associated documentation files (the "Software"), to deal in 
+the Software without restriction, including without limitation the rights to 
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ 
+the Software, and to permit persons to whom the Software is furnished to do so, 
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all 
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ 
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR 
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER 
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN 
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+# Performance regression benchmarks for lazypy. Every benchmark is run
+# for a number of payload sizes and concurrency levels and the median
+# time per operation of some repeats is reported. Results can be saved
+# as JSON and compared against a stored baseline:
+#
+#     python tests/benchmarks.py --save results.json
+#     python tests/benchmarks.py --compare tests/benchmarks.json
+#
+# With --compare the script exits with status 1 if any benchmark got
+# slower than the baseline by more than the tolerance factor. Benchmarks
+# that depend on the scheduler - processes, sockets, many threads - have
+# a larger tolerance of their own.
+
+from __future__ import print_function
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lazypy import delay, spawn, fork, force, Future, ForkedFuture, InterpreterFuture, AsyncFuture
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks.json')
+
+benchmarks = []
+
+tolerances = {}
+
+def benchmark(sizes, concurrency=(1,), tolerance=None):
+    """
+    Register a benchmark function. It is called with a payload size
+    and a concurrency level and returns the number of operations it
+    did, so results are comparable per operation. A tolerance given
+    here is used instead of the default one by compare().
+    """
+
+    def register(func):
+        benchmarks.append((func.__name__, func, tuple(sizes), tuple(concurrency)))
+        if tolerance is not None:
+            tolerances[func.__name__] = tolerance
+        return func
+    return register
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+def payload(size):
+    return list(range(size))
+
+def identity(value):
+    return value
+
+@benchmark(sizes=(1, 1000, 100000))
+def create_force(size, concurrency):
+    """
+    Create and force delayed promises around a payload.
+    """
+
+    data = payload(size)
+    count = 2000
+    for i in range(count):
+        force(delay(identity, (data,)))
+    return count
+
+@benchmark(sizes=(1, 1000))
+def operators(size, concurrency):
+    """
+    Proxy overhead of operators on an already forced promise.
+    """
+
+    p = delay(identity, (payload(size),))
+    force(p)
+    count = 2000
+    for i in range(count):
+        len(p)
+        p[0]
+        p == p
+    return count * 3
+
+@benchmark(sizes=(1, 100000), concurrency=(1, 8), tolerance=2.5)
+def spawn_latency(size, concurrency):
+    """
+    Start concurrency futures and force them all.
+    """
+
+    data = payload(size)
+    rounds = 50
+    for i in range(rounds):
+        futures = [spawn(identity, (data,)) for n in range(concurrency)]
+        for f in futures:
+            force(f)
+    return rounds * concurrency
+
+@benchmark(sizes=(1, 1000), concurrency=(1, 4), tolerance=2.5)
+def fork_latency(size, concurrency):
+    """
+    Fork concurrency processes and force them all - this is the
+    cost of a small ForkedFuture round trip.
+    """
+
+    rounds = 10
+    for i in range(rounds):
+        futures = [fork(payload, (size,), futureclass=ForkedFuture) for n in range(concurrency)]
+        for f in futures:
+            force(f)
+    return rounds * concurrency
+
+@benchmark(sizes=(1 << 10, 1 << 20, 1 << 24), concurrency=(1, 4), tolerance=2.5)
+def fork_transfer(size, concurrency):
+    """
+    Send size bytes back from each of concurrency forked futures.
+    """
+
+    rounds = 3
+    for i in range(rounds):
+        futures = [fork(os.urandom, (size,), futureclass=ForkedFuture) for n in range(concurrency)]
+        for f in futures:
+            force(f)
+    return rounds * concurrency
+
+def burn(n):
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+
+def cpu_bound(futureclass, size, concurrency):
+    """
+    Run concurrency CPU bound thunks of size iterations each.
+    """
+
+    futures = [spawn(burn, (size,), futureclass=futureclass) for n in range(concurrency)]
+    for f in futures:
+        force(f)
+    return concurrency
+
+@benchmark(sizes=(100000, 1000000), concurrency=(1, 4), tolerance=2.5)
+def cpu_future(size, concurrency):
+    """
+    CPU bound thunks in threads - serialized by the GIL.
+    """
+
+    return cpu_bound(Future, size, concurrency)
+
+@benchmark(sizes=(100000, 1000000), concurrency=(1, 4), tolerance=2.5)
+def cpu_forked(size, concurrency):
+    """
+    CPU bound thunks in forked processes.
+    """
+
+    return cpu_bound(ForkedFuture, size, concurrency)
+
+@benchmark(sizes=(100000, 1000000), concurrency=(1, 4), tolerance=2.5)
+def cpu_interpreter(size, concurrency):
+    """
+    CPU bound thunks in subinterpreters (or the process pool on
+    Pythons without them).
+    """
+
+    return cpu_bound(InterpreterFuture, size, concurrency)
+
+# The stand-in for a remote service: a local TCP server that answers
+# every line with size bytes after a short delay, running on an event
+# loop of it's own in a daemon thread.
+_servers = {}
+
+def service(size, delay=0.005):
+    address = _servers.get(size)
+    if address is None:
+        import asyncio
+        import socket
+        import threading
+        loop = asyncio.new_event_loop()
+        async def handle(reader, writer):
+            while await reader.readline():
+                await asyncio.sleep(delay)
+                writer.write(b'x' * size)
+                await writer.drain()
+            writer.close()
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        server = loop.run_until_complete(asyncio.start_server(handle, sock=sock, backlog=8192))
+        thread = threading.Thread(target=loop.run_forever)
+        thread.daemon = True
+        thread.start()
+        address = _servers[size] = sock.getsockname()
+    return address
+
+async def fetch_async(address, size):
+    import asyncio
+    (reader, writer) = await asyncio.open_connection(*address)
+    writer.write(b'get\n')
+    data = await reader.readexactly(size)
+    writer.close()
+    return len(data)
+
+def fetch_blocking(address, size):
+    import socket
+    conn = socket.create_connection(address)
+    try:
+        conn.sendall(b'get\n')
+        received = 0
+        while received < size:
+            received += len(conn.recv(65536))
+        return received
+    finally:
+        conn.close()
+
+def io_bound(futureclass, fetch, size, concurrency):
+    """
+    Fetch size bytes from the stand-in service in concurrency
+    futures at once.
+    """
+
+    address = service(size)
+    futures = [spawn(fetch, (address, size), futureclass=futureclass) for n in range(concurrency)]
+    for f in futures:
+        force(f)
+    return concurrency
+
+@benchmark(sizes=(100,), concurrency=(100, 1000, 4000), tolerance=2.5)
+def io_async(size, concurrency):
+    """
+    Requests to a local socket service from async futures on one
+    event loop.
+    """
+
+    return io_bound(AsyncFuture, fetch_async, size, concurrency)
+
+@benchmark(sizes=(100,), concurrency=(100, 1000), tolerance=2.5)
+def io_threads(size, concurrency):
+    """
+    The same requests from thread futures.
+    """
+
+    return io_bound(Future, fetch_blocking, size, concurrency)
+
+def run(names=None, repeat=9, quick=False):
+    """
+    Run the benchmarks (all or the ones in names) and return a
+    dictionary mapping 'name[size=..,concurrency=..]' to the median
+    seconds per operation of repeat runs.
+    """
+
+    results = {}
+    for (name, func, sizes, concurrency) in benchmarks:
+        if names and name not in names:
+            continue
+        if quick:
+            sizes = sizes[:1]
+            concurrency = concurrency[:1]
+        for size in sizes:
+            for level in concurrency:
+                times = []
+                for i in range(repeat):
+                    start = time.time()
+                    ops = func(size, level)
+                    times.append((time.time() - start) / ops)
+                key = '%s[size=%d,concurrency=%d]' % (name, size, level)
+                results[key] = median(times)
+    return results
+
+def compare(results, baseline, tolerance=2.0, tolerances=None):
+    """
+    Compare results with a baseline and return a list of
+    (key, baseline, result, ratio) for every benchmark that got
+    slower than tolerance times the baseline - or than it's own
+    tolerance from tolerances (by default the ones given to
+    benchmark()), if that is larger. Benchmarks that are not in
+    the baseline are ignored.
+    """
+
+    if tolerances is None:
+        tolerances = globals()['tolerances']
+    regressions = []
+    for key in sorted(results):
+        if key in baseline and baseline[key] > 0:
+            ratio = results[key] / baseline[key]
+            limit = max(tolerance, tolerances.get(key.split('[')[0], tolerance))
+            if ratio > limit:
+                regressions.append((key, baseline[key], results[key], ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='lazypy performance benchmarks')
+    parser.add_argument('names', nargs='*', help='benchmarks to run (default all)')
+    parser.add_argument('--repeat', type=int, default=9)
+    parser.add_argument('--quick', action='store_true',
+                        help='only the smallest size and concurrency level')
+    parser.add_argument('--save', metavar='FILE', help='save the results as JSON')
+    parser.add_argument('--compare', metavar='FILE', nargs='?', const=BASELINE,
+                        help='compare with a baseline (default %(const)s)')
+    parser.add_argument('--tolerance', type=float, default=2.0,
+                        help='allowed slowdown factor (default %(default)s)')
+    args = parser.parse_args(argv)
+
+    results = run(args.names, args.repeat, args.quick)
+    for key in sorted(results):
+        print('%-50s %12.3f us' % (key, results[key] * 1e6))
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'python': platform.python_version(),
+                       'machine': platform.machine(),
+                       'results': results}, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        for (key, old, new, ratio) in regressions:
+            print('REGRESSION %s: %.3f us -> %.3f us (%.2fx)' % (key, old * 1e6, new * 1e6, ratio))
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
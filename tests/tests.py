@@ -26,9 +26,16 @@ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
 from __future__ import unicode_literals
+import gc
 import sys
+import time
 import unittest
 
+try:
+    import cloudpickle
+except ImportError:
+    cloudpickle = None
+
 from lazypy import *
 from lazypy.Utils import *
 
@@ -239,6 +246,143 @@ class TestCase300LazyClass(unittest.TestCase):
         anton += 11
         self.assertEqual(anton, 22)
 
+class CachedLazyClass(LazyEvaluated):
+
+    calls = []
+
+    @lazyattribute
+    def total(self):
+        self.calls.append('total')
+        return 5+6
+
+    @memoized
+    def times(self, a, b=1):
+        self.calls.append(('times', a, b))
+        return a*b
+
+class SlottedLazyClass(LazyEvaluated):
+
+    __slots__ = ('value',)
+
+    @lazyattribute
+    def double(self):
+        return self.value*2
+
+class TestCase350LazyAttributes(unittest.TestCase):
+
+    def setUp(self):
+        CachedLazyClass.calls = []
+        self.obj = CachedLazyClass()
+
+    def testLazyAttribute(self):
+        self.assertTrue(isinstance(self.obj.total, Promise))
+        self.assertTrue(self.obj.total is self.obj.total)
+        self.assertEqual(CachedLazyClass.calls, [])
+        self.assertEqual(self.obj.total, 11)
+        self.assertEqual(self.obj.total+1, 12)
+        self.assertEqual(CachedLazyClass.calls, ['total'])
+
+    def testPerInstance(self):
+        other = CachedLazyClass()
+        self.assertEqual(self.obj.total, 11)
+        self.assertEqual(other.total, 11)
+        self.assertEqual(CachedLazyClass.calls, ['total', 'total'])
+
+    def testMemoized(self):
+        self.assertTrue(self.obj.times(2, b=3) is self.obj.times(2, b=3))
+        self.assertFalse(self.obj.times(2, b=3) is self.obj.times(3, b=2))
+        self.assertEqual(self.obj.times(2, b=3), 6)
+        self.assertEqual(self.obj.times(2, b=3), 6)
+        self.assertEqual(self.obj.times(4), 4)
+        self.assertEqual(CachedLazyClass.calls, [('times', 2, 3), ('times', 4, 1)])
+
+    def testUnhashableArguments(self):
+        self.assertEqual(self.obj.times([1], 2), [1, 1])
+        self.assertEqual(self.obj.times([1], 2), [1, 1])
+        self.assertEqual(len(CachedLazyClass.calls), 2)
+
+    def testReset(self):
+        self.assertEqual(self.obj.total, 11)
+        self.assertEqual(self.obj.times(2), 2)
+        reset(self.obj, 'times')
+        self.assertEqual(self.obj.total, 11)
+        self.assertEqual(self.obj.times(2), 2)
+        reset(self.obj)
+        self.assertEqual(self.obj.total, 11)
+        self.assertEqual(CachedLazyClass.calls,
+                         ['total', ('times', 2, 1), ('times', 2, 1), 'total'])
+
+    def testSlots(self):
+        obj = SlottedLazyClass()
+        self.assertFalse(hasattr(obj, '__dict__'))
+        obj.value = 5
+        self.assertEqual(obj.double, 10)
+        obj.value = 6
+        self.assertEqual(obj.double, 10)
+        reset(obj)
+        self.assertEqual(obj.double, 12)
+
+class ThreadedService(FutureEvaluated):
+
+    @background
+    def fetch(self, a, b):
+        import threading
+        return (a+b, threading.current_thread().name)
+
+    @background(ForkedPoolFuture)
+    def crunch(self, n):
+        import os
+        return (n*n, os.getpid())
+
+    def plain(self):
+        return 'plain'
+
+class ForkedService(ForkEvaluated):
+
+    @background
+    def crunch(self, n):
+        import os
+        return (n*n, os.getpid())
+
+    @background
+    def crash(self):
+        raise MySpecialError(55)
+
+class TestCase380FutureEvaluatedClasses(unittest.TestCase):
+
+    def testThreadPool(self):
+        import threading
+        f = ThreadedService().fetch(5, 6)
+        self.assertTrue(isinstance(f, PoolFuture))
+        (res, name) = force(f)
+        self.assertEqual(res, 11)
+        self.assertNotEqual(name, threading.current_thread().name)
+
+    def testProcessPool(self):
+        import os
+        f = ThreadedService().crunch(5)
+        self.assertTrue(isinstance(f, ForkedPoolFuture))
+        self.assertEqual(f[0], 25)
+        self.assertNotEqual(f[1], os.getpid())
+        fs = [ForkedService().crunch(n) for n in range(10)]
+        self.assertEqual([f[0] for f in fs], [n*n for n in range(10)])
+
+    def testPlainMethods(self):
+        self.assertEqual(ThreadedService().plain(), 'plain')
+
+    def testException(self):
+        self.assertRaises(MySpecialError, force, ForkedService().crash())
+
+    def testDecoratorWithoutMetaClass(self):
+        class Plain(object):
+            @background
+            def anton(self, a, b):
+                return a+b
+
+        f = Plain().anton(5, 6)
+        self.assertTrue(isinstance(f, PoolFuture))
+        self.assertEqual(f, 11)
+
 class TestCase400LazyLists(unittest.TestCase):
 
     def setUp(self):
@@ -326,6 +470,361 @@ class TestCase550ForkedFutures(unittest.TestCase):
         for n in (5, 10, 20, 30):
             self.assertEqual(f(n), fib(n))
     
+def children():
+    import multiprocessing
+    return set(multiprocessing.active_children())
+
+class TestCase555ForkedFutureReaping(unittest.TestCase):
+
+    def openFiles(self):
+        import os
+        return len(os.listdir('/proc/self/fd'))
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'needs /proc')
+    def testManyFutures(self):
+        # 100000 futures take several minutes, so the default run is
+        # smaller - set LAZYPY_REAP_FUTURES=100000 for the full stress run
+        import os, resource, multiprocessing
+
+        processes = children()
+        count = int(os.environ.get('LAZYPY_REAP_FUTURES', 1000))
+        (soft, hard) = resource.getrlimit(resource.RLIMIT_NOFILE)
+        before = self.openFiles()
+        resource.setrlimit(resource.RLIMIT_NOFILE, (before+32, hard))
+        try:
+            for i in range(count):
+                f = fork(lambda : i)
+                if i % 2:
+                    self.assertEqual(f, i)
+                del f
+            for i in range(count // 10):
+                s = fork(lambda : iter(range(i)), futureclass=ForkedStream)
+                if i % 2:
+                    self.assertEqual(list(s), list(range(i)))
+                a = fork(lambda : i, futureclass=ForkedDataflowFuture)
+                b = fork(lambda x: x+1, (a,), futureclass=ForkedDataflowFuture)
+                if i % 2:
+                    self.assertEqual(b, i+1)
+                del s, a, b
+        finally:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+        self.assertTrue(self.openFiles() <= before+2)
+        self.assertEqual(children() - processes, set())
+
+class SmallForkedStream(ForkedStream):
+
+    __batchsize__ = 4
+    __maxbatches__ = 2
+
+class TestCase560ForkedStreams(unittest.TestCase):
+
+    def testStream(self):
+        def gen(n):
+            for i in range(n):
+                yield i*i
+
+        f = fork(gen, (1000,), futureclass=ForkedStream)
+        self.assertTrue(isinstance(f, ForkedStream))
+        self.assertEqual(list(f), [i*i for i in range(1000)])
+
+    def testStreamIsConsumedOnce(self):
+        f = fork(lambda : iter(range(10)), futureclass=SmallForkedStream)
+        self.assertEqual(next(force(f)), 0)
+        self.assertEqual(list(f), list(range(1, 10)))
+        self.assertEqual(list(f), [])
+
+    def testStreamWithException(self):
+        def gen():
+            yield 1
+            yield 2
+            raise MySpecialError(55)
+
+        items = []
+        def consume():
+            for item in fork(gen, futureclass=SmallForkedStream):
+                items.append(item)
+
+        self.assertRaises(MySpecialError, consume)
+        self.assertEqual(items, [1, 2])
+
+    def testBoundedBuffering(self):
+        from multiprocessing import Value
+
+        produced = Value('i', 0)
+        def gen():
+            for i in range(1000):
+                produced.value += 1
+                yield i
+
+        it = force(fork(gen, futureclass=SmallForkedStream))
+        self.assertEqual(next(it), 0)
+        time.sleep(0.2)
+        self.assertTrue(produced.value <= 4*(2+2))
+        self.assertEqual(list(it), list(range(1, 1000)))
+        self.assertEqual(produced.value, 1000)
+
+    def testProducerDies(self):
+        import os
+        from lazypy.Futures import BrokenFutureError
+
+        def gen():
+            yield 1
+            os._exit(3)
+
+        s = fork(gen, futureclass=SmallForkedStream)
+        self.assertRaises(BrokenFutureError, list, s)
+
+    def testUnpicklableItem(self):
+        from lazypy.Futures import BrokenFutureError
+
+        def gen():
+            yield lambda : 1
+
+        s = fork(gen, futureclass=SmallForkedStream)
+        self.assertRaises(BrokenFutureError, list, s)
+
+    def testDroppedStream(self):
+        import multiprocessing
+
+        processes = children()
+        s = fork(lambda : iter(range(10000)), futureclass=SmallForkedStream)
+        del s
+        self.assertEqual(children() - processes, set())
+
+        s = fork(lambda : iter(range(10000)), futureclass=SmallForkedStream)
+        self.assertEqual(next(force(s)), 0)
+        del s
+        gc.collect()
+        self.assertEqual(children() - processes, set())
+
+class TestCase570ForkedDataflowFutures(unittest.TestCase):
+
+    def testDependency(self):
+        import os
+
+        a = fork(lambda : (os.getpid(), 5), futureclass=ForkedDataflowFuture)
+        b = fork(lambda x: (x, os.getpid()), (a,), futureclass=ForkedDataflowFuture)
+        ((producer, value), consumer) = force(b)
+        self.assertEqual(value, 5)
+        self.assertNotEqual(producer, os.getpid())
+        self.assertNotEqual(producer, consumer)
+        self.assertTrue(a._ForkedDataflowFuture__result is NoneSoFar)
+
+    def testGraph(self):
+        a = fork(lambda : 5, futureclass=ForkedDataflowFuture)
+        b = fork(lambda x: x*2, (a,), futureclass=ForkedDataflowFuture)
+        c = fork(lambda x, y: x+y, (a,), {'y': b}, futureclass=ForkedDataflowFuture)
+        self.assertEqual(c, 15)
+        self.assertEqual(b, 10)
+        self.assertEqual(a, 5)
+
+    def testForcedDependency(self):
+        a = fork(lambda : 5, futureclass=ForkedDataflowFuture)
+        self.assertEqual(a, 5)
+        b = fork(lambda x: x+1, (a,), futureclass=ForkedDataflowFuture)
+        self.assertEqual(b, 6)
+
+    def testDependencyWithException(self):
+        def crasher():
+            raise MySpecialError(55)
+
+        a = fork(crasher, futureclass=ForkedDataflowFuture)
+        b = fork(lambda x: x, (a,), futureclass=ForkedDataflowFuture)
+        self.assertRaises(MySpecialError, force, b)
+        self.assertRaises(MySpecialError, force, a)
+
+    def testNestedDependency(self):
+        a = fork(lambda : 5, futureclass=ForkedDataflowFuture)
+        b = fork(lambda : 6, futureclass=ForkedDataflowFuture)
+        c = fork(lambda xs, d: force(xs[0]) + force(d['b']), ([a], {'b': b}),
+                 futureclass=ForkedDataflowFuture)
+        self.assertEqual(c, 11)
+        self.assertTrue(a._ForkedDataflowFuture__result is NoneSoFar)
+
+    def testConsumerDies(self):
+        import os, multiprocessing
+        from lazypy.Futures import BrokenFutureError
+
+        processes = children()
+        a = fork(lambda : 5, futureclass=ForkedDataflowFuture)
+        b = fork(lambda xs: os._exit(3), ([a],), futureclass=ForkedDataflowFuture)
+        self.assertRaises(BrokenFutureError, force, b)
+        self.assertEqual(a, 5)
+        del a, b
+        gc.collect()
+        self.assertEqual(children() - processes, set())
+
+    def testDroppedFutures(self):
+        import multiprocessing
+
+        processes = children()
+        a = fork(lambda : 5, futureclass=ForkedDataflowFuture)
+        b = fork(lambda xs: xs, ([a],), futureclass=ForkedDataflowFuture)
+        c = fork(lambda x: time.sleep(10), (a,), futureclass=ForkedDataflowFuture)
+        del a, b, c
+        gc.collect()
+        self.assertEqual(children() - processes, set())
+
+def square(x):
+    return x*x
+
+def counter(n):
+    for i in range(n):
+        yield i
+
+def crasher():
+    raise MySpecialError(55)
+
+def unpicklable():
+    import threading
+    return threading.Lock()
+
+class TestCase580RemoteFutures(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from lazypy.RemoteFutures import start_workers, set_workers
+        cls.pool = set_workers(start_workers(2) + start_workers(1, family='AF_INET'))
+
+    def testRemoteFuture(self):
+        f = fork(square, (5,), futureclass=RemoteFuture)
+        self.assertTrue(isinstance(f, RemoteFuture))
+        self.assertEqual(f, 25)
+        self.assertEqual(f, 25)
+
+    def testConnectionPooling(self):
+        from lazypy.RemoteFutures import WorkerPool
+
+        class PooledFuture(RemoteFuture):
+            __pool__ = WorkerPool(self.pool.addresses)
+
+        pool = PooledFuture.__pool__
+        fs = [fork(square, (n,), futureclass=PooledFuture) for n in range(9)]
+        self.assertEqual(pool.idle(), 0)
+        self.assertEqual([force(f) for f in fs], [n*n for n in range(9)])
+        self.assertEqual(pool.idle(), 9)
+        fs = [fork(square, (n,), futureclass=PooledFuture) for n in range(9)]
+        self.assertEqual(pool.idle(), 0)
+        self.assertEqual(sum([force(f) for f in fs]), 204)
+        self.assertEqual(pool.idle(), 9)
+        pool.close()
+
+    def testFutureWithException(self):
+        f = fork(crasher, futureclass=RemoteFuture)
+        self.assertRaises(MySpecialError, force, f)
+
+    def testUnpicklableResult(self):
+        f = fork(unpicklable, futureclass=RemoteFuture)
+        self.assertRaises(TypeError, force, f)
+        self.assertEqual([force(fork(square, (n,), futureclass=RemoteFuture)) for n in range(3)], [0, 1, 4])
+
+    def testStream(self):
+        f = fork(counter, (1000,), futureclass=RemoteFuture)
+        self.assertEqual(list(f), list(range(1000)))
+        f = fork(counter, (0,), futureclass=RemoteFuture)
+        self.assertEqual(list(f), [])
+
+    def testDroppedFuture(self):
+        f = fork(square, (5,), futureclass=RemoteFuture)
+        conn = f._RemoteFuture__conn
+        del f
+        self.assertTrue(conn.closed)
+        self.assertEqual(fork(square, (6,), futureclass=RemoteFuture), 36)
+
+class TestCase590LazyImports(unittest.TestCase):
+
+    def testLazyImport(self):
+        mod = lazy_import('xml.dom.minidom')
+        self.assertEqual(type(mod).__name__, 'LazyModule')
+        self.assertEqual(mod.parseString('<a/>').documentElement.tagName, 'a')
+        self.assertTrue(force(mod) is sys.modules['xml.dom.minidom'])
+        self.assertTrue('parseString' in dir(mod))
+
+    def testImportOnFirstUse(self):
+        import subprocess
+        code = ('import sys, lazypy; '
+                'assert "lazypy.ForkedFutures" not in sys.modules; '
+                'lazypy.lazy_import("wave"); '
+                'assert "wave" not in sys.modules; '
+                'lazypy.fork; '
+                'assert "lazypy.ForkedFutures" not in sys.modules; '
+                'lazypy.ForkedFuture; '
+                'assert "multiprocessing" in sys.modules')
+        subprocess.check_call([sys.executable, '-c', code])
+
+    def testImportTime(self):
+        # a small benchmark: report the cost of "import lazypy" and make
+        # sure the heavy standard modules aren't part of it
+        import subprocess
+        proc = subprocess.Popen([sys.executable, '-X', 'importtime', '-c', 'import lazypy'],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        (out, err) = proc.communicate()
+        times = {}
+        for line in err.decode().splitlines():
+            if line.startswith('import time:') and '|' in line:
+                (_, cumulative, name) = line[12:].split('|')
+                if cumulative.strip().isdigit():
+                    times[name.strip()] = int(cumulative)
+        self.assertTrue('lazypy' in times)
+        for name in ('multiprocessing', 'socket', 'select'):
+            self.assertFalse(name in times, name)
+        sys.stderr.write('\nimport lazypy: %dus\n' % times['lazypy'])
+
+class ExpensiveClient(object):
+
+    instances = 0
+
+    def __init__(self, host):
+        ExpensiveClient.instances += 1
+        self.host = host
+        self.open = False
+
+    def __enter__(self):
+        self.open = True
+        return self
+
+    def __exit__(self, *args):
+        self.open = False
+
+class TestCase595LazyProxies(unittest.TestCase):
+
+    def setUp(self):
+        ExpensiveClient.instances = 0
+        self.proxy = delay(ExpensiveClient, ('localhost',), promiseclass=LazyProxy)
+
+    def testDeferredConstruction(self):
+        self.assertEqual(ExpensiveClient.instances, 0)
+        self.assertEqual(self.proxy.host, 'localhost')
+        self.assertEqual(self.proxy.host, 'localhost')
+        self.assertEqual(ExpensiveClient.instances, 1)
+
+    def testSetAttribute(self):
+        self.proxy.timeout = 5
+        self.assertEqual(force(self.proxy).timeout, 5)
+        self.assertEqual(self.proxy.timeout, 5)
+        del self.proxy.timeout
+        self.assertFalse(hasattr(force(self.proxy), 'timeout'))
+        self.assertTrue('host' in dir(self.proxy))
+
+    def testIsInstance(self):
+        self.assertTrue(isinstance(self.proxy, ExpensiveClient))
+        self.assertTrue(self.proxy.__class__ is ExpensiveClient)
+
+    def testContextManager(self):
+        with self.proxy as client:
+            self.assertTrue(client is force(self.proxy))
+            self.assertTrue(self.proxy.open)
+        self.assertFalse(self.proxy.open)
+
+    def testSlots(self):
+        self.assertFalse('__dict__' in dir(type(self.proxy)))
+        self.assertRaises(AttributeError, object.__getattribute__, self.proxy, '__dict__')
+
+    def testOperators(self):
+        p = delay(anton, (5, 6), promiseclass=LazyProxy)
+        self.assertEqual(p+1, 12)
+        self.assertEqual(str(p), '11')
+
 class TestCase600LazyMethod(unittest.TestCase):
 
     def testAttribute(self):
@@ -348,6 +847,883 @@ class TestCase600LazyMethod(unittest.TestCase):
         self.assertTrue(isinstance(o.attr, Promise))
         self.assertEqual(5+o.attr, 16)
 
+def slow(t):
+    time.sleep(t)
+    return t
+
+class TestCase700Profiling(unittest.TestCase):
+
+    def testDisabled(self):
+        self.assertEqual(observers, [])
+        with Profiler() as prof:
+            self.assertEqual(observers, [prof])
+        self.assertEqual(observers, [])
+
+    def testPromises(self):
+        with Profiler() as prof:
+            p = delay(anton, (5, 6))
+            self.assertEqual(p+1, 12)
+            self.assertEqual(p+1, 12)
+        stats = prof.stats()
+        name = [n for n in stats if n.endswith('anton')][0]
+        self.assertEqual(stats[name]['count'], 1)
+        self.assertEqual(stats[name]['errors'], 0)
+        (site,) = stats[name]['callsites']
+        self.assertTrue(site.startswith(__file__.rstrip('c')))
+
+    def testFutures(self):
+        with Profiler() as prof:
+            f = spawn(slow, (0.05,))
+            self.assertEqual(force(f), 0.05)
+        (record,) = prof.records()
+        self.assertTrue(record['duration'] >= 0.05)
+        self.assertTrue(record['created'] <= record['started'] <= record['finished'])
+        self.assertTrue(record['blocked'] >= 0.0)
+        self.assertTrue(record['queued'] >= 0.0)
+        self.assertEqual(prof.pending(), 0)
+
+    def testDroppedPromises(self):
+        import gc
+        with Profiler() as prof:
+            p = delay(anton, (5, 6))
+            q = delay(anton, (1, 2))
+            self.assertEqual(prof.pending(), 2)
+            del p
+            gc.collect()
+            self.assertEqual(prof.pending(), 1)
+            self.assertEqual(q+1, 4)
+        self.assertEqual(prof.pending(), 0)
+        self.assertEqual(len(prof.records()), 1)
+
+    def testForkedFutures(self):
+        with Profiler() as prof:
+            f = fork(slow, (0.05,))
+            self.assertEqual(force(f), 0.05)
+        (record,) = prof.records()
+        self.assertTrue(record['duration'] >= 0.05)
+        self.assertTrue(record['started'] >= record['created'])
+
+    def testErrors(self):
+        with Profiler() as prof:
+            p = delay(crasher, ())
+            self.assertRaises(MySpecialError, force, p)
+        (entry,) = prof.stats().values()
+        self.assertEqual(entry['errors'], 1)
+
+    def testChromeTrace(self):
+        import io, json
+        with Profiler() as prof:
+            force(spawn(slow, (0.01,)))
+        out = io.StringIO()
+        prof.chrome_trace(out)
+        trace = json.loads(out.getvalue())
+        cats = set([e['cat'] for e in trace['traceEvents']])
+        self.assertEqual(cats, set(['queue', 'compute', 'blocked']))
+        for event in trace['traceEvents']:
+            self.assertEqual(event['ph'], 'X')
+
+class TestCase710Benchmarks(unittest.TestCase):
+
+    def testCompare(self):
+        import benchmarks
+        baseline = {'a': 1.0, 'b': 1.0}
+        results = {'a': 1.2, 'b': 2.0, 'c': 5.0}
+        self.assertEqual(benchmarks.compare(results, baseline, 1.5), [('b', 1.0, 2.0, 2.0)])
+        self.assertEqual(benchmarks.compare(results, baseline, 3.0), [])
+
+    def testTolerances(self):
+        import benchmarks
+        baseline = {'a[size=1,concurrency=1]': 1.0, 'b[size=1,concurrency=1]': 1.0}
+        results = {'a[size=1,concurrency=1]': 1.8, 'b[size=1,concurrency=1]': 1.8}
+        self.assertEqual(benchmarks.compare(results, baseline, 1.5, {'a': 2.0}),
+                         [('b[size=1,concurrency=1]', 1.0, 1.8, 1.8)])
+        self.assertEqual(benchmarks.compare(results, baseline, 1.9, {'a': 1.2}), [])
+        self.assertEqual(benchmarks.median([3, 1, 2]), 2)
+        self.assertEqual(benchmarks.median([4, 1, 2, 3]), 2.5)
+
+    def testQuickRun(self):
+        import benchmarks
+        results = benchmarks.run(['create_force', 'operators'], repeat=1, quick=True)
+        self.assertEqual(sorted(results), ['create_force[size=1,concurrency=1]',
+                                           'operators[size=1,concurrency=1]'])
+
+def step(t, *deps):
+    time.sleep(t)
+    return t + sum(deps)
+
+class TestCase720CriticalPath(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = CriticalPath()
+        with self.graph:
+            self.short = delay(step, (0.01,))
+            self.long = delay(step, (0.05,))
+            self.inner = delay(step, (0.02, self.long))
+            self.root = delay(step, (0.001, self.short, self.inner))
+            force(self.root)
+            self.wasted = spawn(step, (0.001,))
+
+    def testGraph(self):
+        nodes = self.graph.nodes()
+        self.assertEqual(len(nodes), 5)
+        self.assertEqual(self.graph.edges(), [(2, 1), (3, 0), (3, 2)])
+        self.assertEqual(self.graph.roots(), [3])
+
+    def testCriticalPath(self):
+        path = [node['id'] for node in self.graph.critical_path()]
+        self.assertEqual(path, [3, 2, 1])
+        summary = self.graph.summary()
+        self.assertTrue(summary['path'] >= 0.07)
+        self.assertTrue(summary['work'] >= summary['path'])
+        self.assertTrue(summary['latency'] >= summary['path'])
+
+    def testSlack(self):
+        slack = self.graph.slack()
+        self.assertEqual(slack[2], 0.0)
+        self.assertEqual(slack[1], 0.0)
+        self.assertTrue(slack[0] >= 0.05)
+        self.assertFalse(3 in slack)
+
+    def testWasted(self):
+        self.assertEqual([node['id'] for node in self.graph.wasted()], [4])
+
+    def testFutureDependencies(self):
+        graph = CriticalPath()
+        with graph:
+            inner = delay(step, (0.01,))
+            f = spawn(lambda: force(inner) + 1, ())
+            force(f)
+        self.assertEqual(graph.edges(), [(1, 0)])
+
+    def testFailingDependency(self):
+        graph = CriticalPath()
+        with graph:
+            outer = delay(step, (0.001, delay(crasher, ())))
+            self.assertRaises(MySpecialError, force, outer)
+            force(delay(step, (0.001,)))
+        nodes = graph.nodes()
+        self.assertEqual([node['error'] for node in nodes], [True, True, False])
+        self.assertFalse(None in [node['forced'] for node in nodes])
+        self.assertEqual(graph.edges(), [(1, 0)])
+        self.assertEqual(sorted(graph.roots()), [1, 2])
+
+    def testOutput(self):
+        import json
+        data = json.loads(self.graph.to_json())
+        self.assertEqual(len(data['nodes']), 5)
+        self.assertEqual([n['id'] for n in data['nodes'] if n['critical']], [1, 2, 3])
+        dot = self.graph.to_dot()
+        self.assertTrue(dot.startswith('digraph promises {'))
+        self.assertTrue('n3 -> n2 [color=red];' in dot)
+        self.assertTrue('style=dashed' in dot)
+
+class SingleSpeculator(SpeculativePromise):
+    __speculators__ = 1
+
+class TestCase730SpeculativePromises(unittest.TestCase):
+
+    def setUp(self):
+        import threading
+        self.gate = threading.Event()
+        self.calls = []
+        self.blocker = delay(self.gate.wait, (), promiseclass=SingleSpeculator)
+
+    def tearDown(self):
+        self.gate.set()
+        force(self.blocker)
+
+    def record(self, value):
+        self.calls.append(value)
+        return value
+
+    def testSpeculated(self):
+        self.gate.set()
+        p = delay(self.record, (5,), promiseclass=SingleSpeculator)
+        for i in range(100):
+            if p.speculated():
+                break
+            time.sleep(0.01)
+        self.assertTrue(p.speculated())
+        self.assertEqual(p+1, 6)
+        self.assertEqual(self.calls, [5])
+
+    def testForcedFirst(self):
+        p = delay(self.record, (5,), promiseclass=SingleSpeculator)
+        self.assertEqual(force(p), 5)
+        self.assertFalse(p.speculated())
+        self.gate.set()
+        force(self.blocker)
+        time.sleep(0.05)
+        self.assertEqual(self.calls, [5])
+
+    def testDropped(self):
+        import weakref
+        p = delay(self.record, (5,), promiseclass=SingleSpeculator)
+        ref = weakref.ref(p)
+        del p
+        gc.collect()
+        self.assertTrue(ref() is None)
+        self.gate.set()
+        force(self.blocker)
+        time.sleep(0.05)
+        self.assertEqual(self.calls, [])
+
+    def testCancel(self):
+        p = delay(self.record, (5,), promiseclass=SingleSpeculator)
+        self.assertTrue(p.cancel())
+        self.gate.set()
+        force(self.blocker)
+        time.sleep(0.05)
+        self.assertEqual(self.calls, [])
+        self.assertEqual(force(p), 5)
+
+    def testSpeculativeError(self):
+        self.gate.set()
+        p = delay(crasher, (), promiseclass=SingleSpeculator)
+        time.sleep(0.05)
+        self.assertRaises(MySpecialError, force, p)
+
+def cheap(a, b):
+    return a + b
+
+def expensive(t):
+    time.sleep(t)
+    return t
+
+class AdaptiveModel(LazyEvaluated):
+
+    __promiseclass__ = Adaptive(threshold=0.001, samples=3)
+
+    def add(self, a, b):
+        return a + b
+
+class TestCase740AdaptiveStrictness(unittest.TestCase):
+
+    def testLearning(self):
+        adaptive = Adaptive(threshold=0.001, samples=3)
+        for i in range(3):
+            p = delay(cheap, (i, 1), promiseclass=adaptive)
+            self.assertTrue(isinstance(p, Promise))
+            self.assertEqual(force(p), i + 1)
+            q = delay(expensive, (0.002,), promiseclass=adaptive)
+            self.assertEqual(force(q), 0.002)
+        name = cheap.__module__ + '.cheap'
+        self.assertEqual(adaptive.decisions()[name], 'eager')
+        self.assertEqual(adaptive.decisions()[expensive.__module__ + '.expensive'], 'lazy')
+        self.assertEqual(len(adaptive.timings()[name]), 3)
+        self.assertEqual(delay(cheap, (1, 2), promiseclass=adaptive), 3)
+        self.assertFalse(isinstance(delay(cheap, (1, 2), promiseclass=adaptive), Promise))
+        self.assertTrue(isinstance(delay(expensive, (0,), promiseclass=adaptive), Promise))
+
+    def testUnforcedStaysLazy(self):
+        adaptive = Adaptive(samples=1)
+        for i in range(5):
+            p = delay(cheap, (i, 1), promiseclass=adaptive)
+        self.assertEqual(adaptive.decisions(), {})
+        self.assertTrue(isinstance(p, Promise))
+
+    def testFutures(self):
+        adaptive = Adaptive(threshold=0.001, samples=1, futureclass=Future)
+        force(delay(expensive, (0.002,), promiseclass=adaptive))
+        self.assertTrue(isinstance(delay(expensive, (0.001,), promiseclass=adaptive), Future))
+
+    def testConfiguredDecisions(self):
+        adaptive = Adaptive(decisions={cheap.__module__ + '.cheap': 'eager'})
+        self.assertEqual(delay(cheap, (1, 2), promiseclass=adaptive), 3)
+        adaptive.decide(expensive, 'lazy')
+        self.assertTrue(isinstance(delay(expensive, (0,), promiseclass=adaptive), Promise))
+        self.assertRaises(ValueError, adaptive.decide, cheap, 'future')
+        adaptive.reset()
+        self.assertEqual(adaptive.decisions(), {})
+
+    def testClosures(self):
+        adaptive = Adaptive(threshold=1.0, samples=2)
+        make = lambda n: (lambda: n)
+        self.assertEqual([force(delay(make(i), promiseclass=adaptive)) for i in range(3)], [0, 1, 2])
+        self.assertEqual([delay(make(i), promiseclass=adaptive) for i in range(3, 5)], [3, 4])
+        other = lambda: -1
+        self.assertTrue(isinstance(delay(other, promiseclass=adaptive), Promise))
+        self.assertEqual(len(adaptive.decisions()), 1)
+
+    def testLazyClass(self):
+        model = AdaptiveModel()
+        for i in range(3):
+            self.assertEqual(force(model.add(i, 1)), i + 1)
+        self.assertEqual(model.add(1, 2), 3)
+        self.assertTrue(type(model.add(1, 2)) is int)
+
+serialized_calls = []
+
+def traced(value):
+    serialized_calls.append(value)
+    return value
+
+def pair(a, b):
+    return (a, b)
+
+class TestCase750Serialization(unittest.TestCase):
+
+    def setUp(self):
+        del serialized_calls[:]
+
+    def testUnforced(self):
+        import pickle
+        p = delay(anton, (5, 6))
+        q = pickle.loads(pickle.dumps(p))
+        self.assertTrue(isinstance(q, Promise))
+        self.assertEqual(q, 11)
+
+    def testSharedSubexpressions(self):
+        from lazypy.Serialization import dumps, loads
+        shared = delay(traced, (21,))
+        graph = delay(pair, (delay(pair, (shared, shared)), shared))
+        copy = loads(dumps(graph))
+        self.assertEqual(serialized_calls, [])
+        self.assertEqual(force(copy), ((21, 21), 21))
+        self.assertEqual(serialized_calls, [21])
+
+    def testForcedNodes(self):
+        from lazypy.Serialization import dumps, loads
+        p = delay(traced, ([1, 2, 3],))
+        force(p)
+        (q,) = loads(dumps([p]))
+        self.assertFalse(isinstance(q, Promise))
+        self.assertEqual(q, [1, 2, 3])
+        self.assertEqual(serialized_calls, [[1, 2, 3]])
+
+    def testCompact(self):
+        from lazypy.Serialization import dumps
+        shared = delay(traced, (list(range(1000)),))
+        once = len(dumps(delay(pair, (shared, 1))))
+        twice = len(dumps(delay(pair, (shared, shared))))
+        self.assertTrue(twice - once < 20)
+
+    def testProxiesAndFutures(self):
+        from lazypy.Serialization import dumps, loads
+        proxy = delay(ExpensiveClient, ('localhost',), promiseclass=LazyProxy)
+        ExpensiveClient.instances = 0
+        copy = loads(dumps(proxy))
+        self.assertEqual(ExpensiveClient.instances, 0)
+        self.assertEqual(copy.host, 'localhost')
+        self.assertEqual(loads(dumps(spawn(anton, (5, 6)))), 11)
+        self.assertEqual(loads(dumps(fork(anton, (5, 6)))), 11)
+
+    def testShippedToWorkers(self):
+        p = delay(traced, (7,))
+        f = spawn(square, (p,), futureclass=ForkedPoolFuture)
+        self.assertEqual(f, 49)
+        self.assertEqual(serialized_calls, [])
+
+class EightThreads(PoolFuture):
+    __poolsize__ = 8
+
+class TestCase760LazyCollections(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+    def record(self, value):
+        self.calls.append(value)
+        return value
+
+    def testDict(self):
+        d = LazyDict([(i, delay(self.record, (i * 10,))) for i in range(100)])
+        d['plain'] = 1
+        self.assertEqual(len(d), 101)
+        self.assertTrue(50 in d)
+        self.assertFalse(500 in d)
+        self.assertEqual(len(list(d)), 101)
+        self.assertEqual(self.calls, [])
+        self.assertEqual(d[5], 50)
+        self.assertEqual(d[5], 50)
+        self.assertEqual(self.calls, [50])
+        self.assertFalse(isinstance(d.raw(5), Promise))
+        self.assertTrue(isinstance(d.raw(6), Promise))
+        self.assertEqual(len(d.pending()), 99)
+        self.assertEqual(d.get(7), 70)
+        self.assertEqual(d.get(700, 'x'), 'x')
+        del d[7]
+        self.assertFalse(7 in d)
+
+    def testList(self):
+        l = LazyList([delay(self.record, (i,)) for i in range(10)])
+        self.assertEqual(len(l), 10)
+        self.assertEqual(self.calls, [])
+        part = l[2:4]
+        self.assertTrue(isinstance(part, LazyList))
+        self.assertEqual(self.calls, [])
+        self.assertEqual(l[3], 3)
+        self.assertEqual(l[-1], 9)
+        self.assertEqual(self.calls, [3, 9])
+        l.append(delay(self.record, (10,)))
+        self.assertEqual(list(l), list(range(11)))
+        self.assertEqual(sorted(self.calls), list(range(11)))
+
+    def testPrefetch(self):
+        d = LazyDict([(i, delay(slow, (0.1,))) for i in range(8)])
+        start = time.time()
+        d.prefetch(range(4), futureclass=EightThreads)
+        self.assertTrue(time.time() - start < 0.35)
+        self.assertEqual(sorted(d.pending()), [4, 5, 6, 7])
+        l = LazyList([delay(slow, (0.1,)) for i in range(8)])
+        start = time.time()
+        l.prefetch(futureclass=EightThreads)
+        self.assertTrue(time.time() - start < 0.35)
+        self.assertEqual(l.pending(), [])
+        self.assertEqual(list(l), [0.1] * 8)
+
+    def testPrefetchForked(self):
+        d = LazyDict(a=delay(square, (3,)), b=delay(self.record, (4,)), c=5)
+        d.prefetch(['a', 'c'], futureclass=ForkedPoolFuture)
+        self.assertEqual(d.pending(), ['b'])
+        self.assertEqual(d['a'], 9)
+
+def blob(n):
+    return b'x' * n
+
+class TestCase770SoftPromises(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = ResultPool(10000)
+        class Soft(SoftPromise):
+            __pool__ = self.pool
+        self.soft = Soft
+
+    def testEviction(self):
+        ps = [delay(blob, (3000,), promiseclass=self.soft) for i in range(5)]
+        for p in ps:
+            self.assertEqual(len(p), 3000)
+        stats = self.pool.stats()
+        self.assertEqual(stats['results'], 3)
+        self.assertEqual(stats['evictions'], 2)
+        self.assertTrue(stats['size'] <= 10000)
+        self.assertEqual(len(ps[4]), 3000)
+        self.assertEqual(ps[4].computed(), 1)
+        self.assertEqual(len(ps[0]), 3000)
+        self.assertEqual(ps[0].computed(), 2)
+
+    def testLeastRecentlyUsed(self):
+        ps = [delay(blob, (3000,), promiseclass=self.soft) for i in range(3)]
+        for p in ps:
+            force(p)
+        force(ps[0])
+        force(delay(blob, (3000,), promiseclass=self.soft))
+        force(ps[0])
+        self.assertEqual(ps[0].computed(), 1)
+        force(ps[1])
+        self.assertEqual(ps[1].computed(), 2)
+
+    def testTooBig(self):
+        p = delay(blob, (20000,), promiseclass=self.soft)
+        self.assertEqual(len(p), 20000)
+        self.assertEqual(len(self.pool), 0)
+        self.assertEqual(len(p), 20000)
+        self.assertEqual(p.computed(), 2)
+
+    def testDropped(self):
+        p = delay(blob, (100,), promiseclass=self.soft)
+        force(p)
+        self.assertEqual(len(self.pool), 1)
+        del p
+        gc.collect()
+        self.assertEqual(len(self.pool), 0)
+        self.assertEqual(self.pool.size, 0)
+
+    def testResize(self):
+        ps = [delay(blob, (3000,), promiseclass=self.soft) for i in range(3)]
+        for p in ps:
+            force(p)
+        self.pool.resize(5000)
+        self.assertEqual(len(self.pool), 1)
+        self.assertTrue(self.pool.size <= 5000)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class Matrix(object):
+
+    def __init__(self, value):
+        self.value = value
+
+    def __matmul__(self, other):
+        return self.value * other
+
+    def __rmatmul__(self, other):
+        return other * self.value + 1
+
+class ProtocolPromise(Promise):
+    __protocols__ = ('path', 'buffer')
+
+class TestCase780ProtocolPassthrough(unittest.TestCase):
+
+    def testIndex(self):
+        i = delay(anton, (1, 2))
+        self.assertEqual([10, 20, 30, 40][i], 40)
+        self.assertEqual(list(range(10))[i:i+2], [3, 4])
+        self.assertEqual(list(range(delay(int, ('3',)))), [0, 1, 2])
+
+    def testContains(self):
+        calls = []
+        def numbers():
+            calls.append(1)
+            return set([1, 2, 3])
+        p = delay(numbers)
+        self.assertTrue(2 in p)
+        self.assertFalse(5 in p)
+        self.assertEqual(calls, [1])
+
+    @unittest.skipIf(sys.version_info < (3, 5), 'no matrix multiplication operator')
+    def testMatmul(self):
+        import operator
+        p = delay(Matrix, (3,))
+        self.assertEqual(operator.matmul(p, 2), 6)
+        self.assertEqual(operator.matmul(2, p), 7)
+
+    def testFspath(self):
+        import os, tempfile
+        (fd, name) = tempfile.mkstemp()
+        os.write(fd, b'lazy')
+        os.close(fd)
+        try:
+            p = delay(str, (name,), promiseclass=ProtocolPromise)
+            with open(p, 'rb') as f:
+                self.assertEqual(f.read(), b'lazy')
+            self.assertEqual(os.fspath(p), name)
+        finally:
+            os.remove(name)
+
+    def testBuffer(self):
+        data = bytearray(1 << 20)
+        p = delay(lambda: data, promiseclass=ProtocolPromise)
+        view = p.__buffer__(0)
+        view[0] = 42
+        self.assertEqual(data[0], 42)
+        self.assertTrue(view.obj is data)
+
+    @unittest.skipIf(sys.version_info < (3, 12), 'memoryview uses __buffer__ since Python 3.12')
+    def testMemoryview(self):
+        data = bytearray(1 << 20)
+        view = memoryview(delay(lambda: data, promiseclass=ProtocolPromise))
+        view[1] = 7
+        self.assertEqual(data[1], 7)
+
+    @unittest.skipIf(sys.version_info < (3, 6), 'no os.PathLike')
+    def testOptIn(self):
+        import os
+        self.assertFalse(isinstance(delay(lambda: 1), os.PathLike))
+        self.assertFalse(hasattr(delay(lambda: b'x'), '__buffer__'))
+        self.assertTrue(isinstance(delay(str, ('x',), promiseclass=ProtocolPromise), os.PathLike))
+        self.assertRaises(ValueError, PromiseMetaClass, 'Broken', (Promise,), {'__protocols__': ('socket',)})
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def testArrayZeroCopy(self):
+        big = numpy.zeros(1 << 22)
+        p = delay(lambda: big)
+        arr = numpy.asarray(p)
+        self.assertTrue(numpy.shares_memory(arr, big))
+        arr[0] = 1.0
+        self.assertEqual(big[0], 1.0)
+        self.assertFalse(numpy.shares_memory(numpy.array(p, copy=True), big))
+        self.assertEqual(numpy.dot(p, numpy.ones(1 << 22)), 1.0)
+
+class NoCutoff(ReactivePromise):
+    __cutoff__ = False
+
+class TestCase790ReactivePromises(unittest.TestCase):
+
+    def setUp(self):
+        self.a = Cell(1)
+        self.b = Cell(10)
+        self.sign = delay(lambda x: x > 0, (self.a,), promiseclass=ReactivePromise)
+        self.scaled = delay(lambda x: x * 2, (self.b,), promiseclass=ReactivePromise)
+        self.top = delay(lambda s, y: (s, y), (self.sign, self.scaled), promiseclass=ReactivePromise)
+
+    def testCached(self):
+        self.assertEqual(self.top, (True, 20))
+        self.assertEqual(self.top, (True, 20))
+        self.assertEqual(self.top.computed(), 1)
+        self.assertFalse(self.top.stale())
+
+    def testOnlyAffectedRecomputed(self):
+        force(self.top)
+        self.b.set(3)
+        self.assertTrue(self.top.stale())
+        self.assertFalse(self.sign.stale())
+        self.assertEqual(self.top, (True, 6))
+        self.assertEqual((self.sign.computed(), self.scaled.computed(), self.top.computed()), (1, 2, 2))
+
+    def testEarlyCutoff(self):
+        force(self.top)
+        self.a.set(5)
+        self.assertEqual(self.top, (True, 20))
+        self.assertEqual((self.sign.computed(), self.top.computed()), (2, 1))
+        self.a.set(-5)
+        self.assertEqual(self.top, (False, 20))
+        self.assertEqual((self.sign.computed(), self.top.computed()), (3, 2))
+
+    def testWithoutCutoff(self):
+        sign = delay(lambda x: x > 0, (self.a,), promiseclass=NoCutoff)
+        top = delay(lambda s: s, (sign,), promiseclass=NoCutoff)
+        force(top)
+        self.a.set(5)
+        self.assertEqual(top, True)
+        self.assertEqual(top.computed(), 2)
+
+    def testSameValue(self):
+        force(self.top)
+        self.a.set(1)
+        self.assertFalse(self.top.stale())
+
+    def testDynamicDependencies(self):
+        calls = []
+        def pick():
+            calls.append(1)
+            return force(self.b) if force(self.a) > 0 else 0
+        p = delay(pick, (), promiseclass=ReactivePromise)
+        self.assertEqual(p, 10)
+        self.a.set(-1)
+        self.assertEqual(p, 0)
+        self.b.set(7)
+        self.assertFalse(p.stale())
+        self.assertEqual(p, 0)
+        self.assertEqual(len(calls), 2)
+
+    def testInvalidate(self):
+        state = [1]
+        p = delay(lambda: state[0], (), promiseclass=ReactivePromise)
+        top = delay(lambda x: x + 1, (p,), promiseclass=ReactivePromise)
+        self.assertEqual(top, 2)
+        state[0] = 5
+        p.invalidate()
+        self.assertEqual(top, 6)
+
+class TestCase800InterpreterFutures(unittest.TestCase):
+
+    def testResult(self):
+        f = spawn(square, (7,), futureclass=InterpreterFuture)
+        self.assertEqual(f, 49)
+        self.assertTrue(f.backend() in ('interpreters', 'processes'))
+
+    def testBackend(self):
+        import lazypy.InterpreterFutures
+        f = spawn(square, (3,), futureclass=InterpreterFuture)
+        if lazypy.InterpreterFutures.interpreters:
+            self.assertEqual(f.backend(), 'interpreters')
+        else:
+            self.assertEqual(f.backend(), 'processes')
+        force(f)
+
+    @unittest.skipIf(cloudpickle is None, 'closures need cloudpickle')
+    def testClosure(self):
+        offset = 5
+        f = spawn(lambda x: x + offset, (1,), futureclass=InterpreterFuture)
+        self.assertEqual(f, 6)
+
+    def testException(self):
+        f = spawn(crasher, (), futureclass=InterpreterFuture)
+        self.assertRaises(MySpecialError, force, f)
+
+class TestCase810Audit(unittest.TestCase):
+
+    def entry(self, audit, klass):
+        (entry,) = [e for e in audit.report() if e['class'] == klass and e['function'].endswith('slow')]
+        return entry
+
+    def testPromises(self):
+        with Audit() as audit:
+            used = delay(slow, (0.0,))
+            unused = delay(slow, (0.0,))
+            dropped = delay(slow, (0.0,))
+            force(used)
+            del dropped
+            gc.collect()
+        entry = self.entry(audit, 'Promise')
+        self.assertEqual(entry['created'], 3)
+        self.assertEqual(entry['live'], 2)
+        self.assertEqual(entry['forced'], 1)
+        self.assertEqual(entry['never_forced'], 1)
+        self.assertEqual(entry['dropped_unforced'], 1)
+
+    def testWastedFutures(self):
+        with Audit() as audit:
+            f = spawn(slow, (0.02,))
+            g = spawn(slow, (0.01,))
+            force(g)
+            del f, g
+            gc.collect()
+        entry = self.entry(audit, 'Future')
+        self.assertEqual(entry['dropped_unforced'], 1)
+        self.assertTrue(entry['wasted_cpu'] >= 0.02)
+        self.assertTrue(entry['cpu'] >= 0.03)
+        self.assertEqual(audit.report()[0]['class'], 'Future')
+
+    def testPendingAndReset(self):
+        with Audit() as audit:
+            f = spawn(slow, (0.01,))
+            dropped = spawn(slow, (0.01,))
+            del dropped
+            gc.collect()
+        entry = self.entry(audit, 'Future')
+        self.assertEqual(entry['never_forced'], 1)
+        self.assertTrue(entry['pending_cpu'] >= 0.01)
+        audit.report(reset=True)
+        entry = self.entry(audit, 'Future')
+        self.assertEqual(entry['created'], 0)
+        self.assertEqual(entry['dropped_unforced'], 0)
+        self.assertEqual(entry['live'], 1)
+        self.assertEqual(audit.totals()['live'], 1)
+
+    def testStopped(self):
+        audit = Audit()
+        delay(slow, (0.0,))
+        self.assertEqual(audit.report(), [])
+
+@unittest.skipIf(sys.version_info < (3, 5), 'AsyncFuture needs asyncio')
+class TestCase820AsyncFutures(unittest.TestCase):
+
+    def setUp(self):
+        import asyncio
+        self.sleep = asyncio.sleep
+        self.wait_for = asyncio.wait_for
+
+    def testResult(self):
+        f = spawn(self.sleep, (0.01, 5), futureclass=AsyncFuture)
+        self.assertEqual(f + 1, 6)
+        self.assertEqual(spawn(square, (3,), futureclass=AsyncFuture), 9)
+
+    def testException(self):
+        self.assertRaises(MySpecialError, force, spawn(crasher, (), futureclass=AsyncFuture))
+        f = spawn(self.wait_for, (self.sleep(1), 0.01), futureclass=AsyncFuture)
+        self.assertRaises(Exception, force, f)
+
+    def testConcurrent(self):
+        start = time.time()
+        futures = [spawn(self.sleep, (0.2, i), futureclass=AsyncFuture) for i in range(10000)]
+        self.assertEqual([force(f) for f in futures], list(range(10000)))
+        self.assertTrue(time.time() - start < 2.0)
+
+    def testMemory(self):
+        import tracemalloc
+        force(spawn(self.sleep, (0,), futureclass=AsyncFuture))
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            futures = [spawn(self.sleep, (0.3,), futureclass=AsyncFuture) for i in range(10000)]
+            time.sleep(0.1)
+            used = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        for f in futures:
+            force(f)
+        self.assertTrue(used / 10000 < 4096)
+
+    def testManyForcers(self):
+        import threading
+        f = spawn(self.sleep, (0.05, 7), futureclass=AsyncFuture)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(force(f))) for i in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, [7, 7, 7])
+
+    def testAwait(self):
+        inner = spawn(self.sleep, (0.01, 4), futureclass=AsyncFuture)
+        outer = spawn(self.wait_for, (inner, 1), futureclass=AsyncFuture)
+        self.assertEqual(outer, 4)
+
+    def testAwaitErrors(self):
+        import asyncio
+        failing = spawn(crasher, (), futureclass=AsyncFuture)
+        outer = spawn(self.wait_for, (failing, 1), futureclass=AsyncFuture)
+        self.assertRaises(MySpecialError, force, outer)
+        inner = spawn(self.sleep, (0.1, 4), futureclass=AsyncFuture)
+        outer = spawn(self.wait_for, (inner, 0.01), futureclass=AsyncFuture)
+        self.assertRaises(asyncio.TimeoutError, force, outer)
+        self.assertEqual(inner, 4)
+
+class TestCase830RecordFiles(unittest.TestCase):
+
+    def setUp(self):
+        import tempfile
+        self.dir = tempfile.mkdtemp()
+        self.path = self.dir + '/records'
+        f = open(self.path, 'wb')
+        for i in range(20000):
+            f.write(('record %d\n' % i).encode('ascii'))
+        f.close()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.dir)
+
+    def testIncremental(self):
+        with RecordFile(self.path, chunksize=4096) as records:
+            first = records[0]
+            self.assertTrue(isinstance(first, Promise))
+            self.assertEqual(records.scanned(), 0)
+            self.assertEqual(force(first), b'record 0')
+            self.assertFalse(records.complete())
+            self.assertTrue(records.scanned() <= 4096)
+            self.assertEqual(force(records[123]), b'record 123')
+            self.assertFalse(records.complete())
+            self.assertEqual(len(records), 20000)
+            self.assertTrue(records.complete())
+            self.assertEqual(force(records[-1]), b'record 19999')
+            self.assertRaises(IndexError, force, records[20000])
+
+    def testIteration(self):
+        with RecordFile(self.path, decode=lambda view: int(bytes(view).split()[1]), chunksize=100) as records:
+            it = iter(records)
+            self.assertEqual(force(next(it)), 0)
+            self.assertFalse(records.complete())
+            self.assertEqual(sum([force(r) for r in it]), sum(range(1, 20000)))
+
+    def testZeroCopy(self):
+        with RecordFile(self.path) as records:
+            view = records.raw(5)
+            self.assertTrue(isinstance(view, memoryview))
+            self.assertEqual(view.tobytes(), b'record 5')
+            view.release()
+
+    def testCompactIndex(self):
+        from array import array
+        with RecordFile(self.path) as records:
+            len(records)
+            offsets = records._RecordFile__offsets
+            self.assertTrue(isinstance(offsets, array))
+            self.assertEqual(len(offsets), 20000)
+
+    def testPersistedIndex(self):
+        import os
+        index = self.path + '.idx'
+        with RecordFile(self.path, index=index) as records:
+            self.assertFalse(records.complete())
+            self.assertEqual(len(records), 20000)
+        self.assertTrue(os.path.exists(index))
+        with RecordFile(self.path, index=index) as records:
+            self.assertTrue(records.complete())
+            self.assertEqual(force(records[-2]), b'record 19998')
+        with open(self.path, 'ab') as f:
+            f.write(b'record 20000\n')
+        with RecordFile(self.path, index=index) as records:
+            self.assertFalse(records.complete())
+            self.assertEqual(len(records), 20001)
+
+    def testSeparators(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'a<>bb<>ccc')
+        with RecordFile(self.path, separator=b'<>', chunksize=1) as records:
+            self.assertEqual([force(r) for r in records], [b'a', b'bb', b'ccc'])
+        with open(self.path, 'wb') as f:
+            pass
+        with RecordFile(self.path) as records:
+            self.assertEqual(len(records), 0)
+            self.assertEqual(list(records), [])
+
 if __name__ == '__main__':
     unittest.main()
 